@@ -4,22 +4,47 @@ Cleanup Check Script - Suggests file organization improvements
 Scans a project directory and recommends files to move to _scratch/ or _output/.
 Runs in dry-run mode by default. Use --fix to actually move files.
 Checks Python files for unused imports by default (use --skip-imports to disable).
+Import analysis runs in a process pool; results are cached per file in
+.cleanup_cache at the project root, so unchanged files are not parsed again
+(add .cleanup_cache to .gitignore).
+The project is listed in one walk that skips system folders and anything
+matched by .gitignore files (use --no-gitignore to include those files).
+With --workspace, every project under the given folder is checked
+concurrently and summarized in one report with per-project timings; the exit
+status is 1 if any project could not be checked.
+With --since REF or --staged, only files changed relative to a git ref (or
+staged for commit) are checked, which keeps pre-commit hooks fast; --staged
+checks the staged contents, not the working tree.
 
 Usage:
-    python cleanup_check.py [project_path] [--fix] [--skip-imports]
+    python cleanup_check.py [project_path] [--fix] [--skip-imports] [--no-cache] [--jobs N] [--no-gitignore]
+    python cleanup_check.py [project_path] [--since REF | --staged] [...]
+    python cleanup_check.py [workspace_path] --workspace [--workers N] [...]
 
 Examples:
     python cleanup_check.py Training/
     python cleanup_check.py SpendTracker/ --fix
     python cleanup_check.py . --skip-imports  # File organization only
+    python cleanup_check.py . --workspace     # All projects in the workspace
+    python cleanup_check.py . --staged        # Pre-commit: staged files only
+    python cleanup_check.py . --since main    # Files changed since main
 """
 
 import os
 import sys
 import ast
+import hashlib
+import json
+import re
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Tuple, Set, Optional
 import argparse
+from fnmatch import translate
 
 
 # Files that should always stay at root level
@@ -98,37 +123,78 @@ OUTPUT_KEYWORDS = [
 # System folders and files to ignore completely
 IGNORE_FILES = {
     '.git', '__pycache__', '.venv', 'venv', 'node_modules',
-    '.pytest_cache', '.mypy_cache', '.DS_Store', 'Thumbs.db'
+    '.pytest_cache', '.mypy_cache', '.DS_Store', 'Thumbs.db', '.cleanup_cache'
 }
 
+# Organized folders: not descended into when listing the project
+SKIP_DIRS = {'_scratch', '_archive'}
+
+# .gitignore matching follows the file system's case sensitivity
+GITIGNORE_FLAGS = re.IGNORECASE if os.name == 'nt' else 0
+
+# A folder holding any of these is a project (--workspace mode)
+PROJECT_MARKERS = {
+    'README.md', 'HANDOFF.md', '_TODO.md', 'CLAUDE.md', '.git',
+    'pyproject.toml', 'setup.py', 'requirements.txt', 'package.json'
+}
+
+# How many folder levels below the workspace to look for projects
+PROJECT_SEARCH_DEPTH = 2
+
+# Per-file unused-import results, kept at the project root between runs
+CACHE_FILE = '.cleanup_cache'
+CACHE_VERSION = 1
+
+# Below this many files to parse, a process pool costs more than it saves
+PARALLEL_MIN_FILES = 50
+
 # Input file threshold: Only suggest data/ folder if more than this many input files
 INPUT_FILE_THRESHOLD = 20
 
+# Suffixes of input/data files
+INPUT_SUFFIXES = {'.csv', '.xlsx', '.json', '.xml', '.txt'}
 
-def matches_pattern(filename: str, patterns: List[str]) -> bool:
-    """Check if filename matches any glob pattern."""
-    from fnmatch import fnmatch
-    return any(fnmatch(filename.lower(), pattern.lower()) for pattern in patterns)
 
+# Filename rules in the order they are tried: (group, patterns, keywords, category, reason)
+FILENAME_RULES = [
+    ('main', MAIN_SCRIPT_PATTERNS, [], 'correct', "main script"),
+    ('scratch_pattern', SCRATCH_PATTERNS, [], 'scratch', "matches scratch pattern"),
+    ('scratch_keyword', [], SCRATCH_KEYWORDS, 'scratch', "contains keyword suggesting experiment/test"),
+    ('output_pattern', OUTPUT_PATTERNS, [], 'output', "matches output pattern"),
+    ('output_keyword', [], OUTPUT_KEYWORDS, 'output', "appears to be generated output"),
+]
 
-def contains_keyword(filename: str, keywords: List[str]) -> bool:
-    """Check if filename contains any keyword."""
-    filename_lower = filename.lower()
-    return any(keyword in filename_lower for keyword in keywords)
 
+def compile_classifier() -> re.Pattern:
+    """
+    Compile FILENAME_RULES into one regex over lowercased filenames: one named
+    group per rule, alternatives in rule order, so a single fullmatch finds
+    the first rule that applies (match.lastgroup). Glob patterns use fnmatch
+    semantics; keywords match anywhere in the name.
+    """
+    groups = []
+    for group, patterns, keywords, _, _ in FILENAME_RULES:
+        alternatives = [translate(pattern.lower()) for pattern in patterns]
+        if keywords:
+            alternatives.append('(?s:.*(?:' + '|'.join(re.escape(k.lower()) for k in keywords) + ').*)')
+        if alternatives:
+            groups.append(f'(?P<{group}>' + '|'.join(alternatives) + ')')
+    return re.compile('|'.join(groups))
 
-def should_ignore(path: Path) -> bool:
-    """Check if path should be ignored."""
-    return path.name in IGNORE_FILES or any(ignore in str(path) for ignore in IGNORE_FILES)
 
+FILENAME_CLASSIFIER = compile_classifier()
+FILENAME_CATEGORIES = {group: (category, reason) for group, _, _, category, reason in FILENAME_RULES}
 
-def is_main_script(filename: str) -> bool:
-    """Check if file is a main script that should stay at root."""
-    # Exact match for project-specific main scripts
+
+def classify_filename(filename: str) -> Optional[Tuple[str, str]]:
+    """(category, reason) from the filename alone, or None if no rule applies."""
+    # Exact names first: core project files, then project-specific main scripts
+    if filename in ROOT_ALLOWED:
+        return 'correct', "core project file"
     if filename in PROJECT_MAIN_SCRIPTS:
-        return True
-    # Pattern match for common main script names
-    return matches_pattern(filename, MAIN_SCRIPT_PATTERNS)
+        return 'correct', "main script"
+    match = FILENAME_CLASSIFIER.fullmatch(filename.lower())
+    return FILENAME_CATEGORIES[match.lastgroup] if match else None
 
 
 def find_unused_imports(filepath: Path) -> Set[str]:
@@ -136,10 +202,15 @@ def find_unused_imports(filepath: Path) -> Set[str]:
     Detect unused imports in a Python file using AST parsing.
     Returns set of import names that are imported but never used.
     """
+    with open(filepath, 'rb') as f:
+        return unused_imports_in_source(f.read(), filepath)
+
+
+def unused_imports_in_source(source: bytes, filepath: Path) -> Set[str]:
+    """Unused imports of one file's contents (empty if it does not parse)."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            tree = ast.parse(f.read(), filename=str(filepath))
-    except (SyntaxError, UnicodeDecodeError):
+        tree = ast.parse(source.decode('utf-8'), filename=str(filepath))
+    except (SyntaxError, UnicodeDecodeError, ValueError):
         # Skip files with syntax errors or encoding issues
         return set()
     
@@ -160,9 +231,229 @@ def find_unused_imports(filepath: Path) -> Set[str]:
     return imports - used_names
 
 
-def categorize_files(project_path: Path) -> Dict[str, List[Tuple[Path, str]]]:
+def _gitignore_regex(pattern: str) -> str:
+    """Translate one .gitignore pattern (without '!', '/' anchors or trailing '/') to a regex."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            out.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif char == '*':
+            out.append('[^/]*')
+            i += 1
+        elif char == '?':
+            out.append('[^/]')
+            i += 1
+        elif char == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            chars = pattern[i + 1:end]
+            if chars.startswith('!'):
+                chars = '^' + chars[1:]
+            out.append('[' + chars.replace('\\', '\\\\') + ']')
+            i = end + 1
+        elif char == '\\' and i + 1 < len(pattern):
+            out.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(char))
+            i += 1
+    return ''.join(out)
+
+
+class GitIgnore:
+    """
+    Compiled rules of one .gitignore file. Paths are relative to the folder
+    holding it. When no rule is negated ('!'), all rules are joined into one
+    regex per kind (files, folders); otherwise the last matching rule wins.
+    """
+
+    def __init__(self, lines: List[str]):
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []  # (regex, negated, folders only)
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated or line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            # A slash anywhere but the end anchors the pattern to this folder
+            regex = _gitignore_regex(line.lstrip('/'))
+            if '/' not in line:
+                regex = '(?:.*/)?' + regex
+            self.rules.append((re.compile(regex, GITIGNORE_FLAGS), negated, dir_only))
+
+        self.combined = None
+        if not any(negated for _, negated, _ in self.rules):
+            self.combined = {
+                is_dir: re.compile(
+                    '|'.join(f'(?:{regex.pattern})' for regex, _, dir_only in self.rules
+                             if is_dir or not dir_only) or '(?!)',
+                    GITIGNORE_FLAGS
+                )
+                for is_dir in (False, True)
+            }
+
+    @classmethod
+    def read(cls, path: str) -> 'GitIgnore':
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return cls(f.read().splitlines())
+        except OSError:
+            return cls([])
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a '!' rule, None if no rule matches."""
+        if self.combined is not None:
+            return True if self.combined[is_dir].fullmatch(rel_path) else None
+        for regex, negated, dir_only in reversed(self.rules):
+            if (is_dir or not dir_only) and regex.fullmatch(rel_path):
+                return not negated
+        return None
+
+
+def changed_files(project_path: Path, since: Optional[str] = None, staged: bool = False) -> Set[str]:
     """
-    Categorize files in project into: scratch, output, correct, or input.
+    Project-relative paths of files changed according to git: staged for
+    commit (staged=True), or differing from the `since` ref in the working
+    tree plus untracked files that are not git-ignored. Deleted files are
+    left out. Raises RuntimeError if git fails (not a repository, bad ref).
+    """
+    def git(*args: str) -> List[str]:
+        try:
+            result = subprocess.run(['git', *args], cwd=project_path, capture_output=True, text=True,
+                                    encoding='utf-8')
+        except OSError as e:
+            raise RuntimeError(f"cannot run git: {e}")
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"git {args[0]} failed")
+        return [path for path in result.stdout.split('\0') if path]
+
+    # Fails with a clear message outside a repository (git diff would not)
+    git('rev-parse', '--git-dir')
+    
+    # --relative limits the diff to project_path and makes paths relative to it
+    if staged:
+        return set(git('diff', '--cached', '--name-only', '--relative', '--diff-filter=ACMR', '-z'))
+    return set(git('diff', '--name-only', '--relative', '--diff-filter=ACMR', '-z', since, '--')) | \
+        set(git('ls-files', '--others', '--exclude-standard', '-z'))
+
+
+def staged_contents(project_path: Path, rel_paths: List[str]) -> Dict[str, bytes]:
+    """
+    Contents of project-relative paths as staged in the git index, read with
+    one `git cat-file --batch` process. Paths not in the index are left out.
+    Raises RuntimeError if git fails.
+    """
+    request = ''.join(f":./{rel_path}\n" for rel_path in rel_paths).encode('utf-8')
+    try:
+        result = subprocess.run(['git', 'cat-file', '--batch'], cwd=project_path, input=request,
+                                capture_output=True)
+    except OSError as e:
+        raise RuntimeError(f"cannot run git: {e}")
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip() or "git cat-file failed")
+    
+    # Each answer is "<oid> blob <size>\n<contents>\n", or "<name> missing\n"
+    contents = {}
+    output = result.stdout
+    pos = 0
+    for rel_path in rel_paths:
+        end = output.index(b'\n', pos)
+        header = output[pos:end].split()
+        pos = end + 1
+        if len(header) != 3:
+            continue
+        size = int(header[2])
+        if header[1] == b'blob':
+            contents[rel_path] = output[pos:pos + size]
+        pos += size + 1
+    return contents
+
+
+def list_project(
+    project_path: Path,
+    use_gitignore: bool = True,
+    only: Optional[Set[str]] = None
+) -> List[Tuple[str, os.DirEntry]]:
+    """
+    List every file of the project in one os.scandir walk, as sorted
+    (relative path with '/', DirEntry) pairs. System folders (IGNORE_FILES),
+    organized folders (SKIP_DIRS) and paths matched by a .gitignore in the
+    project are skipped; ignored folders are never descended into. The same
+    listing feeds categorize_files and check_unused_imports.
+    With only (relative paths, e.g. from changed_files), subfolders are only
+    entered on the way to one of those files and only they are listed below
+    the root; root files are always all listed (categorize_files counts them).
+    """
+    # Folders leading to a wanted file: 'a/', 'a/b/', ...
+    wanted_dirs = None
+    if only is not None:
+        wanted_dirs = {path[:i + 1] for path in only for i, char in enumerate(path) if char == '/'}
+
+    files = []
+    # (folder path, relative prefix, [(relative prefix of .gitignore folder, rules)])
+    stack: List[Tuple[str, str, List[Tuple[str, GitIgnore]]]] = [(str(project_path), '', [])]
+    while stack:
+        dir_path, prefix, gitignores = stack.pop()
+        try:
+            entries = list(os.scandir(dir_path))
+        except OSError as e:
+            print(f"Warning: cannot read {dir_path}: {e}")
+            continue
+
+        if use_gitignore and any(entry.name == '.gitignore' for entry in entries):
+            gitignores = gitignores + [(prefix, GitIgnore.read(os.path.join(dir_path, '.gitignore')))]
+
+        for entry in entries:
+            if entry.name in IGNORE_FILES:
+                continue
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if is_dir and entry.name in SKIP_DIRS:
+                continue
+
+            rel_path = prefix + entry.name
+            # The deepest .gitignore with a matching rule decides
+            for base, gitignore in reversed(gitignores):
+                ignored = gitignore.match(rel_path[len(base):], is_dir)
+                if ignored is not None:
+                    break
+            else:
+                ignored = False
+            if ignored:
+                continue
+
+            if is_dir:
+                if wanted_dirs is None or rel_path + '/' in wanted_dirs:
+                    stack.append((entry.path, rel_path + '/', gitignores))
+            elif entry.is_file() and (only is None or not prefix or rel_path in only):
+                files.append((rel_path, entry))
+
+    files.sort(key=lambda item: item[0])
+    return files
+
+
+def categorize_files(
+    project_path: Path,
+    listing: Optional[List[Tuple[str, os.DirEntry]]] = None,
+    only: Optional[Set[str]] = None
+) -> Dict[str, List[Tuple[Path, str]]]:
+    """
+    Categorize files at the project root into: scratch, output, correct, or input.
+    listing is a list_project() result (walked here if not given).
+    With only, just those relative paths are categorized (all root files
+    still count towards the data/ folder suggestion).
     Returns dict with lists of (file_path, reason) tuples.
     """
     results = {
@@ -172,63 +463,32 @@ def categorize_files(project_path: Path) -> Dict[str, List[Tuple[Path, str]]]:
         'input': []
     }
     
-    # Skip if already in organized folders
-    organized_folders = {'_scratch', '_output', '_archive', '.github', 'scripts', 'config', 'data', 'docs'}
+    if listing is None:
+        listing = list_project(project_path)
     
-    for item in project_path.iterdir():
-        if item.is_dir():
-            if item.name in organized_folders:
-                continue
-            # Don't categorize subdirectories
-            continue
-            
-        if should_ignore(item):
-            continue
-        
-        filename = item.name
-        
-        # Files explicitly allowed at root
-        if filename in ROOT_ALLOWED:
-            results['correct'].append((item, "core project file"))
-            continue
-        
-        # Main scripts stay at root
-        if is_main_script(filename):
-            results['correct'].append((item, "main script"))
-            continue
-        
-        # Check for scratch patterns
-        if matches_pattern(filename, SCRATCH_PATTERNS):
-            reason = f"matches scratch pattern"
-            results['scratch'].append((item, reason))
-            continue
-        
-        # Check for scratch keywords
-        if contains_keyword(filename, SCRATCH_KEYWORDS):
-            reason = f"contains keyword suggesting experiment/test"
-            results['scratch'].append((item, reason))
+    # Subdirectories (organized folders included) are not categorized
+    root_files = [project_path / rel_path for rel_path, _ in listing if '/' not in rel_path]
+    
+    # Root files per suffix, counted once for the data/ folder suggestion
+    suffix_counts = Counter(item.suffix for item in root_files)
+    
+    for item in root_files:
+        if only is not None and item.name not in only:
             continue
         
-        # Check for output patterns
-        if matches_pattern(filename, OUTPUT_PATTERNS):
-            reason = f"matches output pattern"
-            results['output'].append((item, reason))
+        # Core files, main scripts, scratch and output patterns/keywords
+        classified = classify_filename(item.name)
+        if classified:
+            category, reason = classified
+            results[category].append((item, reason))
             continue
         
-        # Check for output keywords (but be more conservative)
-        if contains_keyword(filename, OUTPUT_KEYWORDS):
-            # Don't move if it looks like a main script
-            if not is_main_script(filename):
-                reason = f"appears to be generated output"
-                results['output'].append((item, reason))
-                continue
-        
         # Check if it's a data/input file
-        if item.suffix in ['.csv', '.xlsx', '.json', '.xml', '.txt'] and not item.name.startswith('_'):
-            # Count similar files - only suggest data/ folder if many files
-            similar_files = list(project_path.glob(f'*{item.suffix}'))
-            if len(similar_files) > INPUT_FILE_THRESHOLD:
-                results['input'].append((item, f"one of {len(similar_files)} {item.suffix} files - consider data/ folder"))
+        if item.suffix in INPUT_SUFFIXES and not item.name.startswith('_'):
+            # Only suggest data/ folder if many similar files
+            similar_count = suffix_counts[item.suffix]
+            if similar_count > INPUT_FILE_THRESHOLD:
+                results['input'].append((item, f"one of {similar_count} {item.suffix} files - consider data/ folder"))
             else:
                 results['correct'].append((item, "input file"))
             continue
@@ -239,31 +499,312 @@ def categorize_files(project_path: Path) -> Dict[str, List[Tuple[Path, str]]]:
     return results
 
 
-def check_unused_imports(project_path: Path) -> Dict[Path, Set[str]]:
+def load_cache(project_path: Path) -> Dict[str, dict]:
+    """Cached per-file results from .cleanup_cache (empty if missing or outdated)."""
+    try:
+        with open(project_path / CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(project_path: Path, files: Dict[str, dict]):
+    """
+    Write .cleanup_cache atomically: a uniquely named temp file (concurrent
+    runs never share one), given the default file mode, renamed into place.
+    """
+    cache_path = project_path / CACHE_FILE
+    tmp_name = None
+    try:
+        fd, tmp_name = tempfile.mkstemp(prefix=CACHE_FILE + '.', suffix='.tmp', dir=project_path)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_name, 0o666 & ~umask)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': CACHE_VERSION, 'files': files}))
+        os.replace(tmp_name, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write {cache_path}: {e}")
+        if tmp_name:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+
+def _analyze_file(task: Tuple[str, Optional[str]]) -> Tuple[str, Optional[List[str]]]:
+    """
+    Worker: hash one file and, unless the hash equals the cached one (touched
+    but not modified), parse it. Returns (hash, sorted unused imports), with
+    None instead of the imports when the cached result still holds.
+    """
+    path, cached_hash = task
+    try:
+        with open(path, 'rb') as f:
+            source = f.read()
+    except OSError:
+        # Removed or unreadable since it was listed
+        return '', []
+    digest = hashlib.sha1(source).hexdigest()
+    if digest == cached_hash:
+        return digest, None
+    return digest, sorted(unused_imports_in_source(source, Path(path)))
+
+
+def check_unused_imports(
+    project_path: Path,
+    use_cache: bool = True,
+    jobs: Optional[int] = None,
+    listing: Optional[List[Tuple[str, os.DirEntry]]] = None,
+    only: Optional[Set[str]] = None,
+    staged: bool = False
+) -> Dict[Path, Set[str]]:
     """
     Check all Python files in project for unused imports.
+    listing is a list_project() result (walked here if not given).
+    With only, just those relative paths are checked and the cache entries
+    of all other files are kept as they are.
+    Files whose (path, mtime, size) or content hash match .cleanup_cache reuse
+    the cached result; the rest are parsed in a process pool of `jobs`
+    workers (default: CPU count).
+    With staged, the contents staged in the git index are checked instead of
+    the working tree (see _check_staged).
     Returns dict of {file_path: set of unused imports}.
     """
-    unused_by_file = {}
+    cache = load_cache(project_path) if use_cache else {}
+    
+    if listing is None:
+        listing = list_project(project_path, only=only)
+    
+    if staged:
+        return _check_staged(project_path, cache, jobs, listing, only)
     
-    # Find all Python files (skip _scratch, _archive, .venv, etc.)
-    for py_file in project_path.rglob('*.py'):
-        # Skip files in system/organized folders
-        if any(skip in py_file.parts for skip in ['_scratch', '_archive', '.venv', 'venv', '__pycache__', '.git']):
+    checked: Dict[str, dict] = {}
+    pending: List[Tuple[str, os.stat_result, Optional[str]]] = []
+    
+    for rel_path, entry in listing:
+        if not rel_path.endswith('.py') or (only is not None and rel_path not in only):
             continue
-        
-        unused = find_unused_imports(py_file)
-        if unused:
-            unused_by_file[py_file.relative_to(project_path)] = unused
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        cached = cache.get(rel_path)
+        if cached and cached['mtime'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+            checked[rel_path] = cached
+        else:
+            pending.append((rel_path, stat, cached['hash'] if cached and cached['size'] == stat.st_size else None))
+    
+    tasks = [(str(project_path / rel_path), cached_hash) for rel_path, _, cached_hash in pending]
+    if len(tasks) >= PARALLEL_MIN_FILES and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            analyzed = list(pool.map(_analyze_file, tasks, chunksize=16))
+    else:
+        analyzed = [_analyze_file(task) for task in tasks]
+    
+    for (rel_path, stat, _), (digest, unused) in zip(pending, analyzed):
+        if unused is None:
+            unused = cache[rel_path]['unused']
+        checked[rel_path] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'hash': digest, 'unused': unused}
     
-    return unused_by_file
+    # A full run drops entries of files that are gone; a partial one keeps the rest
+    new_cache = checked if only is None else {**cache, **checked}
+    if use_cache and new_cache != cache:
+        save_cache(project_path, new_cache)
+    
+    return {
+        Path(rel_path): set(result['unused'])
+        for rel_path, result in sorted(checked.items())
+        if result['unused']
+    }
 
 
-def print_results(results: Dict[str, List[Tuple[Path, str]]], project_path: Path, fix: bool = False, unused_imports: Dict[Path, Set[str]] = None):
+def _check_staged(
+    project_path: Path,
+    cache: Dict[str, dict],
+    jobs: Optional[int],
+    listing: List[Tuple[str, os.DirEntry]],
+    only: Optional[Set[str]]
+) -> Dict[Path, Set[str]]:
+    """
+    check_unused_imports over the staged contents of the listed Python files.
+    A cached result is reused when its content hash equals the staged blob's,
+    but nothing is written back: the cache is keyed by working-tree mtime and
+    size, which say nothing about the staged contents.
+    """
+    rel_paths = [rel_path for rel_path, _ in listing
+                 if rel_path.endswith('.py') and (only is None or rel_path in only)]
+    contents = staged_contents(project_path, rel_paths)
+    
+    results: Dict[str, List[str]] = {}
+    pending: List[str] = []
+    for rel_path, source in contents.items():
+        cached = cache.get(rel_path)
+        if cached and cached['hash'] == hashlib.sha1(source).hexdigest():
+            results[rel_path] = cached['unused']
+        else:
+            pending.append(rel_path)
+    
+    sources = [contents[rel_path] for rel_path in pending]
+    paths = [project_path / rel_path for rel_path in pending]
+    if len(pending) >= PARALLEL_MIN_FILES and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            analyzed = list(pool.map(unused_imports_in_source, sources, paths, chunksize=16))
+    else:
+        analyzed = [unused_imports_in_source(source, path) for source, path in zip(sources, paths)]
+    results.update(zip(pending, analyzed))
+    
+    return {
+        Path(rel_path): set(unused)
+        for rel_path, unused in sorted(results.items())
+        if unused
+    }
+
+
+def scan_project(
+    project_path: Path,
+    skip_imports: bool = False,
+    use_cache: bool = True,
+    jobs: Optional[int] = None,
+    use_gitignore: bool = True,
+    since: Optional[str] = None,
+    staged: bool = False
+) -> dict:
+    """
+    Run both checks on one project from a single listing, restricted to the
+    files git reports as changed when since or staged is given.
+    Returns {'path', 'results', 'unused_imports', 'files', 'seconds'};
+    unused_imports is None when skipped.
+    """
+    start = time.perf_counter()
+    only = changed_files(project_path, since, staged) if since or staged else None
+    listing = list_project(project_path, use_gitignore=use_gitignore, only=only)
+    results = categorize_files(project_path, listing, only=only)
+    unused_imports = None
+    if not skip_imports:
+        unused_imports = check_unused_imports(project_path, use_cache=use_cache, jobs=jobs, listing=listing,
+                                              only=only, staged=staged)
+    return {
+        'path': project_path,
+        'results': results,
+        'unused_imports': unused_imports,
+        'files': len(listing) if only is None else sum(1 for rel_path, _ in listing if rel_path in only),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def discover_projects(workspace_path: Path) -> List[Path]:
+    """
+    Project folders below workspace_path: folders holding a PROJECT_MARKERS
+    file, up to PROJECT_SEARCH_DEPTH levels down. Projects are not searched
+    for nested projects; hidden and '_' folders (_reference, _scratch, ...)
+    and IGNORE_FILES are skipped.
+    """
+    projects = []
+    stack = [(workspace_path, 0)]
+    while stack:
+        folder, depth = stack.pop()
+        try:
+            entries = list(os.scandir(folder))
+        except OSError as e:
+            print(f"Warning: cannot read {folder}: {e}")
+            continue
+        for entry in entries:
+            if (entry.name in IGNORE_FILES or entry.name.startswith(('.', '_'))
+                    or not entry.is_dir(follow_symlinks=False)):
+                continue
+            try:
+                names = set(os.listdir(entry.path))
+            except OSError:
+                continue
+            if names & PROJECT_MARKERS:
+                projects.append(Path(entry.path))
+            elif depth + 1 < PROJECT_SEARCH_DEPTH:
+                stack.append((Path(entry.path), depth + 1))
+    return sorted(projects)
+
+
+def check_workspace(
+    workspace_path: Path,
+    workers: Optional[int] = None,
+    skip_imports: bool = False,
+    use_cache: bool = True,
+    use_gitignore: bool = True,
+    since: Optional[str] = None,
+    staged: bool = False
+) -> List[dict]:
+    """
+    Scan every discovered project in a process pool of at most `workers`
+    processes (default: CPU count), one project per task. Each project's
+    import check runs serially inside its worker. Returns scan_project()
+    results in project order; a project that fails has an 'error' instead.
+    """
+    projects = discover_projects(workspace_path)
+    if not projects:
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(projects))
+    scans = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(scan_project, project, skip_imports, use_cache, 1, use_gitignore, since, staged): project
+            for project in projects
+        }
+        for future, project in futures.items():
+            try:
+                scans[project] = future.result()
+            except Exception as e:
+                scans[project] = {'path': project, 'error': f"{type(e).__name__}: {e}"}
+    return [scans[project] for project in projects]
+
+
+def print_workspace_summary(scans: List[dict], workspace_path: Path, elapsed: float):
+    """Print one line per project (files, suggestions, unused imports, time) and totals."""
+    print()
+    print("=" * 60)
+    print("WORKSPACE SUMMARY")
+    print(f"Workspace: {workspace_path.absolute()}")
+    print("=" * 60)
+    print()
+
+    width = max([len('Project')] + [len(str(scan['path'].relative_to(workspace_path))) for scan in scans])
+    print(f"  {'Project':<{width}}  {'Files':>7}  {'Moves':>5}  {'Imports':>7}  {'Time':>7}")
+    totals = {'files': 0, 'moves': 0, 'imports': 0, 'seconds': 0.0}
+    for scan in scans:
+        name = str(scan['path'].relative_to(workspace_path))
+        if 'error' in scan:
+            print(f"  {name:<{width}}  [ERROR] {scan['error']}")
+            continue
+        results = scan['results']
+        moves = len(results['scratch']) + len(results['output']) + len(results['input'])
+        imports = sum(len(names) for names in (scan['unused_imports'] or {}).values())
+        imports_text = str(imports) if scan['unused_imports'] is not None else '-'
+        print(f"  {name:<{width}}  {scan['files']:>7}  {moves:>5}  {imports_text:>7}  {scan['seconds']:>6.2f}s")
+        totals['files'] += scan['files']
+        totals['moves'] += moves
+        totals['imports'] += imports
+        totals['seconds'] += scan['seconds']
+
+    imports_checked = any(scan.get('unused_imports') is not None for scan in scans)
+    imports_text = str(totals['imports']) if imports_checked else '-'
+    print(f"  {'-' * (width + 35)}")
+    print(f"  {'Total':<{width}}  {totals['files']:>7}  {totals['moves']:>5}  {imports_text:>7}  "
+          f"{totals['seconds']:>6.2f}s")
+    print()
+    print(f"[OK] Checked {len(scans)} projects in {elapsed:.2f}s "
+          f"(sum of project times: {totals['seconds']:.2f}s)")
+
+
+def print_results(results: Dict[str, List[Tuple[Path, str]]], project_path: Path, fix: bool = False, unused_imports: Dict[Path, Set[str]] = None, scope: Optional[str] = None):
     """Print categorization results."""
     print("=" * 60)
     print(f"CLEANUP CHECK {'(executing moves)' if fix else '(dry-run)'}")
     print(f"Scanning: {project_path.absolute()}")
+    if scope:
+        print(f"Only: {scope}")
     print("=" * 60)
     print()
     
@@ -375,6 +916,9 @@ Examples:
   python cleanup_check.py Training/
   python cleanup_check.py . --fix
   python cleanup_check.py SpendTracker/ --skip-imports
+  python cleanup_check.py . --workspace
+  python cleanup_check.py . --staged
+  python cleanup_check.py . --since origin/main
         """
     )
     parser.add_argument('project_path', nargs='?', default='.',
@@ -383,6 +927,21 @@ Examples:
                         help='Actually move files (default: dry-run only)')
     parser.add_argument('--skip-imports', action='store_true',
                         help='Skip checking Python files for unused imports')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Re-parse every Python file (do not read or write {CACHE_FILE})')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes for the import check (default: CPU count, 1 = no pool)')
+    parser.add_argument('--no-gitignore', action='store_true',
+                        help='Also check files matched by .gitignore')
+    parser.add_argument('--workspace', action='store_true',
+                        help='Treat the path as a workspace: check every project in it concurrently')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Projects checked at once in --workspace mode (default: CPU count)')
+    changes = parser.add_mutually_exclusive_group()
+    changes.add_argument('--since', metavar='REF',
+                         help='Only check files changed since this git ref (plus untracked files)')
+    changes.add_argument('--staged', action='store_true',
+                         help='Only check files staged for commit (for pre-commit hooks)')
     
     args = parser.parse_args()
     
@@ -396,16 +955,47 @@ Examples:
         print(f"Error: Path is not a directory: {project_path}")
         sys.exit(1)
     
-    # Categorize files
-    results = categorize_files(project_path)
+    scope = None
+    if args.staged:
+        scope = "files staged for commit"
+    elif args.since:
+        scope = f"files changed since {args.since}"
     
-    # Check for unused imports by default (unless skipped)
-    unused_imports = None
-    if not args.skip_imports:
-        unused_imports = check_unused_imports(project_path)
+    if args.workspace:
+        start = time.perf_counter()
+        scans = check_workspace(project_path, workers=args.workers, skip_imports=args.skip_imports,
+                                use_cache=not args.no_cache, use_gitignore=not args.no_gitignore,
+                                since=args.since, staged=args.staged)
+        elapsed = time.perf_counter() - start
+        if not scans:
+            print(f"No projects found in {project_path}")
+            sys.exit(1)
+        for scan in scans:
+            if 'error' in scan:
+                continue
+            print_results(scan['results'], scan['path'], args.fix, scan['unused_imports'], scope)
+            if args.fix:
+                moved_count = execute_moves(scan['results'], scan['path'])
+                print(f"\n[OK] Moved {moved_count} files")
+            print()
+        print_workspace_summary(scans, project_path, elapsed)
+        # Like a failed single-project scan, any failed project fails the run
+        if any('error' in scan for scan in scans):
+            sys.exit(1)
+        return
+    
+    # Categorize files and check for unused imports (unless skipped)
+    try:
+        scan = scan_project(project_path, skip_imports=args.skip_imports, use_cache=not args.no_cache,
+                            jobs=args.jobs, use_gitignore=not args.no_gitignore,
+                            since=args.since, staged=args.staged)
+    except RuntimeError as e:
+        print(f"Error: git: {e}")
+        sys.exit(1)
+    results = scan['results']
     
     # Print results
-    print_results(results, project_path, args.fix, unused_imports)
+    print_results(results, project_path, args.fix, scan['unused_imports'], scope)
     
     # Execute moves if --fix flag is set
     if args.fix:
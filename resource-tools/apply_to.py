@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""
+ApplyTo Resolver
+Answers "which instructions apply to this file?" without testing every
+instruction's globs. index_builder groups the applyTo globs of all
+instructions by file extension and by literal file name and writes them to
+indexes/applyto-index.json; resource_loader compiles that once and only runs
+the regexes in the buckets a path can fall into
+"""
+
+import re
+from typing import Dict, List, Any
+
+from globs import expand_braces, glob_to_regex, split_patterns
+
+# Bump when the on-disk layout changes so stale indexes are ignored
+APPLY_TO_INDEX_VERSION = 1
+
+# Globs that match every file
+MATCH_ALL = {'**', '**/*'}
+
+# Literal text after the last wildcard of a glob's final segment, e.g. '.razor.cs'
+LITERAL_TAIL = re.compile(r'[^*?/\[\]]+$')
+
+
+def build_apply_to_index(instructions: List[Dict[str, Any]], generated_at: str) -> Dict[str, Any]:
+    """
+    Bucket every applyTo glob (braces expanded) by how a path can be tested:
+      everything  - '**': no test needed
+      basenames   - final segment is a literal file name: name -> [[id, regex]]
+      extensions  - final segment ends in literal '.ext': ext -> [[id, suffix, regex]]
+      patterns    - anything else: [[id, regex]]
+    regex is None when the bucket key (and suffix) alone decides the match.
+    Ids index into 'instructions' (paths). Instructions without applyTo are left out.
+    """
+    paths: List[str] = []
+    everything: List[int] = []
+    basenames: Dict[str, List[List[Any]]] = {}
+    extensions: Dict[str, List[List[Any]]] = {}
+    patterns: List[List[Any]] = []
+
+    for resource in instructions:
+        globs = dict.fromkeys(
+            glob for raw in split_patterns(resource.get('appliesTo')) for glob in expand_braces(raw)
+        )
+        if not globs:
+            continue
+
+        instruction_id = len(paths)
+        paths.append(resource['path'])
+
+        for glob in globs:
+            if glob in MATCH_ALL:
+                everything.append(instruction_id)
+                continue
+
+            last = glob.rsplit('/', 1)[-1]
+            regex = glob_to_regex(glob)
+            tail = LITERAL_TAIL.search(last)
+
+            if '*' not in last and '?' not in last:
+                basenames.setdefault(last.lower(), []).append(
+                    [instruction_id, None if glob == f'**/{last}' else regex]
+                )
+            elif tail and '.' in tail.group(0):
+                suffix = tail.group(0).lower()
+                extension = suffix[suffix.rindex('.'):]
+                extensions.setdefault(extension, []).append(
+                    [instruction_id, suffix, None if glob == f'**/*{tail.group(0)}' else regex]
+                )
+            else:
+                patterns.append([instruction_id, regex])
+
+    return {
+        'version': APPLY_TO_INDEX_VERSION,
+        'generatedAt': generated_at,
+        'instructions': paths,
+        'everything': everything,
+        'basenames': basenames,
+        'extensions': extensions,
+        'patterns': patterns,
+    }
+
+
+def compile_index(index: Dict[str, Any]) -> Dict[str, Any]:
+    """Compile the regexes of a loaded applyto-index.json (case-insensitive)"""
+    def compiled(regex):
+        return re.compile(regex, re.IGNORECASE) if regex else None
+
+    return {
+        'generatedAt': index['generatedAt'],
+        'instructions': index['instructions'],
+        'everything': set(index['everything']),
+        'basenames': {
+            name: [(i, compiled(regex)) for i, regex in entries]
+            for name, entries in index['basenames'].items()
+        },
+        'extensions': {
+            ext: [(i, suffix, compiled(regex)) for i, suffix, regex in entries]
+            for ext, entries in index['extensions'].items()
+        },
+        'patterns': [(i, compiled(regex)) for i, regex in index['patterns']],
+    }
+
+
+def normalize_path(path: str) -> str:
+    """Forward slashes, no leading './' or '/'"""
+    path = path.replace('\\', '/')
+    while path.startswith('./'):
+        path = path[2:]
+    return path.lstrip('/')
+
+
+def match(matcher: Dict[str, Any], path: str) -> List[int]:
+    """Ids of the instructions whose applyTo matches path (a compile_index result)"""
+    path = normalize_path(path)
+    lower = path.lower()
+    name = lower.rsplit('/', 1)[-1]
+    ids = set(matcher['everything'])
+
+    for i, regex in matcher['basenames'].get(name, ()):
+        if regex is None or regex.fullmatch(path):
+            ids.add(i)
+
+    dot = name.rfind('.')
+    if dot >= 0:
+        for i, suffix, regex in matcher['extensions'].get(name[dot:], ()):
+            if lower.endswith(suffix) and (regex is None or regex.fullmatch(path)):
+                ids.add(i)
+
+    for i, regex in matcher['patterns']:
+        if regex.fullmatch(path):
+            ids.add(i)
+
+    return sorted(ids)
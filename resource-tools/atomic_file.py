@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+"""
+Atomic File
+Temporary files for write-then-rename updates of the index files. Names are
+unique (concurrent builders never share one) and the file gets the mode a
+plain open() would create, so renamed indexes stay readable by other users
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Tuple
+
+
+def _default_mode() -> int:
+    """0o666 minus the process umask (which can only be read by setting it)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def mkstemp_for(path: Path) -> Tuple[int, str]:
+    """
+    tempfile.mkstemp next to path, chmod-ed from mkstemp's 0600 to the
+    default file mode. Returns (fd, temporary file name).
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix=path.name + '.', suffix='.tmp', dir=path.parent)
+    try:
+        os.chmod(tmp_name, _default_mode())
+    except BaseException:
+        os.close(fd)
+        os.unlink(tmp_name)
+        raise
+    return fd, tmp_name
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+
+"""
+Resource Tools Benchmark
+Generates synthetic corpora of markdown resources and measures index build
+time, peak RSS, on-disk index size, and search/get latency (p50/p99).
+Results are machine-readable JSON and can be compared against a stored baseline
+
+Usage:
+    python benchmark.py [--sizes 1000,10000,100000] [--output results.json]
+                        [--baseline baseline.json] [--save-baseline baseline.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+try:
+    import resource as _resource  # Unix only; peak RSS is reported as None elsewhere
+except ImportError:
+    _resource = None
+
+TOOLS_DIR = Path(__file__).parent
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_QUERIES = 200
+DEFAULT_TOLERANCE = 0.25
+SEED = 42
+
+# Share of generated resources per category
+CATEGORY_MIX = {
+    'agents': 0.40,
+    'prompts': 0.30,
+    'instructions': 0.25,
+    'skills': 0.05,
+}
+
+# Lower is better for every metric compared against the baseline
+COMPARED_METRICS = [
+    'buildSeconds',
+    'incrementalSeconds',
+    'peakRssMB',
+    'indexBytes',
+    'coldQueryMs',
+    'searchP50Ms',
+    'searchP99Ms',
+    'getP50Ms',
+    'getP99Ms',
+]
+
+VOCABULARY = (
+    'react angular vue svelte python java kotlin rust go csharp dotnet azure aws gcp '
+    'terraform bicep kubernetes docker sql postgres mysql mongodb redis kafka graphql '
+    'rest api testing performance security accessibility refactoring documentation '
+    'migration architecture review debugging logging monitoring pipeline deployment '
+    'frontend backend database cache query index optimization agent prompt workflow '
+    'typescript javascript node deno bun flutter swift android ios electron tauri '
+    'pandas numpy spark airflow dbt snowflake databricks powershell bash linux windows'
+).split()
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(count))
+
+
+def _document(rng: random.Random, category: str, name: str) -> str:
+    """One markdown resource with realistic frontmatter and a few sections"""
+    description = _words(rng, rng.randint(8, 25)).capitalize()
+    frontmatter = [f"name: '{name}'", f"description: '{description}'"]
+
+    if category == 'agents':
+        tools = ', '.join(f"'{t}'" for t in rng.sample(['codebase', 'search', 'editFiles', 'runCommands', 'fetch', 'problems'], 3))
+        frontmatter.append(f'tools: [{tools}]')
+    elif category == 'instructions':
+        frontmatter.append(f"applyTo: '**/*.{rng.choice(['py', 'ts', 'js', 'cs', 'java', 'go', 'md'])}'")
+    else:
+        frontmatter.append(f'tags: {", ".join(rng.sample(VOCABULARY, 3))}')
+
+    body = [f'# {name.replace("-", " ").title()}', '', _words(rng, 40), '']
+    for _ in range(rng.randint(2, 8)):
+        body += [f'## {_words(rng, 3).title()}', '']
+        for _ in range(rng.randint(1, 4)):
+            body += [_words(rng, rng.randint(20, 120)), '']
+        if rng.random() < 0.3:
+            body += ['```python', f'def {rng.choice(VOCABULARY)}():', '    pass', '```', '']
+
+    return '---\n' + '\n'.join(frontmatter) + '\n---\n\n' + '\n'.join(body)
+
+
+def generate_corpus(workspace: Path, size: int, seed: int = SEED) -> Dict[str, int]:
+    """Write size synthetic resources under workspace/_reference/awesome-copilot"""
+    rng = random.Random(seed)
+    base = workspace / '_reference' / 'awesome-copilot'
+    counts = {}
+
+    for category, share in CATEGORY_MIX.items():
+        count = max(1, int(size * share))
+        counts[category] = count
+        folder = base / category
+        folder.mkdir(parents=True, exist_ok=True)
+
+        for i in range(count):
+            name = f'{rng.choice(VOCABULARY)}-{rng.choice(VOCABULARY)}-{category[:-1]}-{i}'
+            if category == 'skills':
+                path = folder / name / 'SKILL.md'
+                path.parent.mkdir(exist_ok=True)
+            else:
+                suffix = {'agents': 'agent', 'prompts': 'prompt', 'instructions': 'instructions'}[category]
+                path = folder / f'{name}.{suffix}.md'
+            path.write_text(_document(rng, category, name), encoding='utf-8')
+
+    return counts
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if _resource is None:
+        return None
+    peak = _resource.getrusage(_resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_worker(queries: int) -> Dict[str, Any]:
+    """
+    Measure one corpus (selected via RESOURCE_TOOLS_WORKSPACE / _INDEX_DIR).
+    Runs in its own process so peak RSS and caches are per corpus.
+    """
+    import contextlib
+    import io
+
+    import index_builder
+    import resource_loader
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        index_builder.build_index()
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index_builder.build_index(incremental=True)
+        incremental_seconds = time.perf_counter() - start
+
+    index_bytes = sum(f.stat().st_size for f in index_builder.OUTPUT_DIR.iterdir() if f.is_file())
+
+    rng = random.Random(SEED)
+    start = time.perf_counter()
+    resources = resource_loader.list_resources()
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    search_ms = []
+    for _ in range(queries):
+        query = ' '.join(rng.sample(VOCABULARY, rng.choice([1, 1, 2, 3])))
+        start = time.perf_counter()
+        resource_loader.search_resources(query, limit=10)
+        search_ms.append((time.perf_counter() - start) * 1000)
+
+    get_ms = []
+    for _ in range(queries):
+        name = rng.choice(resources)['name']
+        start = time.perf_counter()
+        resource_loader.get_resource_by_name(name)
+        get_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'resources': len(resources),
+        'buildSeconds': round(build_seconds, 3),
+        'incrementalSeconds': round(incremental_seconds, 3),
+        'peakRssMB': _peak_rss_mb(),
+        'indexBytes': index_bytes,
+        'coldQueryMs': round(cold_ms, 3),
+        'searchP50Ms': round(_percentile(search_ms, 50), 3),
+        'searchP99Ms': round(_percentile(search_ms, 99), 3),
+        'getP50Ms': round(_percentile(get_ms, 50), 3),
+        'getP99Ms': round(_percentile(get_ms, 99), 3),
+    }
+
+
+def benchmark_size(size: int, queries: int, keep: bool = False) -> Dict[str, Any]:
+    """Generate a corpus of the given size and measure it in a subprocess"""
+    workspace = Path(tempfile.mkdtemp(prefix=f'resource-bench-{size}-'))
+    try:
+        start = time.perf_counter()
+        generate_corpus(workspace, size)
+        generate_seconds = time.perf_counter() - start
+
+        env = {
+            **os.environ,
+            'RESOURCE_TOOLS_WORKSPACE': str(workspace),
+            'RESOURCE_TOOLS_INDEX_DIR': str(workspace / 'indexes'),
+            'RESOURCE_TOOLS_BACKEND': 'json',
+            # Measure ranking, not cache hits on repeated random queries
+            'RESOURCE_TOOLS_QUERY_CACHE': 'off',
+        }
+        completed = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), '--worker', '--queries', str(queries)],
+            cwd=str(TOOLS_DIR), env=env, capture_output=True, text=True, check=True
+        )
+        result = json.loads(completed.stdout)
+        result['size'] = size
+        result['generateSeconds'] = round(generate_seconds, 3)
+        return result
+    finally:
+        if keep:
+            print(f'Corpus kept at {workspace}', file=sys.stderr)
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Metrics that got worse than baseline by more than tolerance (e.g. 0.25 = 25%)"""
+    previous = {str(r['size']): r for r in baseline.get('runs', [])}
+    regressions = []
+
+    for run in results['runs']:
+        base = previous.get(str(run['size']))
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = base.get(metric), run.get(metric)
+            if not old or new is None:
+                continue
+            ratio = new / old
+            if ratio > 1 + tolerance:
+                regressions.append({
+                    'size': run['size'],
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'ratio': round(ratio, 2)
+                })
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark resource-tools indexing and search')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated corpus sizes (default: 1000,10000,100000)')
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES,
+                        help='Searches and gets timed per corpus (default: 200)')
+    parser.add_argument('--output', type=Path, help='Write results JSON to this file')
+    parser.add_argument('--baseline', type=Path, help='Compare against a stored results file')
+    parser.add_argument('--save-baseline', type=Path, help='Also store results as a new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slowdown before a metric counts as a regression (default: 0.25)')
+    parser.add_argument('--keep', action='store_true', help='Keep generated corpora')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.queries)))
+        return
+
+    results = {
+        'generatedAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'runs': []
+    }
+
+    for size in (int(s) for s in args.sizes.split(',') if s.strip()):
+        print(f'Benchmarking {size} resources...', file=sys.stderr)
+        run = benchmark_size(size, args.queries, args.keep)
+        results['runs'].append(run)
+        print(f'  build {run["buildSeconds"]}s, incremental {run["incrementalSeconds"]}s, '
+              f'index {run["indexBytes"] / 1024:.0f} KB, search p50/p99 {run["searchP50Ms"]}/{run["searchP99Ms"]} ms, '
+              f'get p50/p99 {run["getP50Ms"]}/{run["getP99Ms"]} ms', file=sys.stderr)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results['regressions'] = regressions
+        for r in regressions:
+            print(f'[!] {r["metric"]} at {r["size"]}: {r["baseline"]} -> {r["current"]} ({r["ratio"]}x)', file=sys.stderr)
+        if not regressions:
+            print('[OK] No regressions against baseline', file=sys.stderr)
+        exit_code = 1 if regressions else 0
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding='utf-8')
+    else:
+        print(output)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(output, encoding='utf-8')
+
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
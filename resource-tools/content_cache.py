@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+"""
+Content Cache
+Byte-budgeted LRU cache for resource file contents used by resource_loader.
+Entries are keyed by path and validated against the file's mtime, so edited
+files are re-read
+"""
+
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+class ContentCache:
+    """LRU of path -> (mtime_ns, text) holding at most max_bytes of file content"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, Tuple[int, int, str]]' = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path: str, mtime_ns: int) -> Optional[str]:
+        """Cached text if present and still current, else None (counted as a miss)"""
+        entry = self._entries.get(path)
+        if entry and entry[0] == mtime_ns:
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def put(self, path: str, mtime_ns: int, size: int, text: str):
+        """
+        Store text (size is its byte count on disk), evicting least recently
+        used entries to stay within the budget. Files larger than the whole
+        budget are not cached.
+        """
+        self._discard(path)
+        if size > self.max_bytes:
+            return
+
+        self._entries[path] = (mtime_ns, size, text)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    def _discard(self, path: str):
+        entry = self._entries.pop(path, None)
+        if entry:
+            self.bytes -= entry[1]
+
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        self._entries.clear()
+        self.bytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, bytes held, budget and hit/miss/eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'maxBytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hitRate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
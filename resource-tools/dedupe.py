@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+"""
+Dedupe
+Near-duplicate detection for index_builder with MinHash signatures and LSH
+banding. Each document becomes a set of word shingles; a one-permutation
+MinHash (one pass, NUM_BINS minimums) estimates Jaccard similarity, and only
+documents sharing an LSH band bucket are compared
+"""
+
+import base64
+import struct
+import zlib
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from search_index import TOKEN_PATTERN
+
+# Words per shingle
+SHINGLE_SIZE = 5
+
+# Signature length = LSH_BANDS * LSH_ROWS; candidates share all rows of a band.
+# With 16 bands of 8 rows, pairs above ~0.7 similarity are almost always compared
+NUM_BINS = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_BINS // LSH_BANDS
+
+# Estimated Jaccard similarity at which two resources count as duplicates
+DUPLICATE_THRESHOLD = 0.95
+
+_EMPTY = -1
+_MASK64 = (1 << 64) - 1
+
+# Signatures stored in the build manifest: NUM_BINS little-endian uint64, base64
+_PACKED = struct.Struct(f'<{NUM_BINS}Q')
+
+
+def _shingle_hashes(text: str) -> set:
+    """64-bit hashes of the word shingles of text"""
+    words = TOKEN_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words + [''] * (SHINGLE_SIZE - len(words)) if words else []
+
+    hashes = set()
+    for i in range(len(words) - SHINGLE_SIZE + 1):
+        shingle = ' '.join(words[i:i + SHINGLE_SIZE]).encode('utf-8')
+        hashes.add(zlib.crc32(shingle) | (zlib.adler32(shingle) << 32))
+    return hashes
+
+
+def signature(text: str) -> Optional[List[int]]:
+    """
+    One-permutation MinHash: each shingle hash falls into one of NUM_BINS bins
+    by its low bits and each bin keeps its minimum. Empty bins borrow the next
+    non-empty bin's value so short documents still compare sensibly.
+    Values are kept to 64 bits. None for text without words.
+    """
+    hashes = _shingle_hashes(text)
+    if not hashes:
+        return None
+
+    bins = [_EMPTY] * NUM_BINS
+    for h in hashes:
+        b = h % NUM_BINS
+        value = h // NUM_BINS
+        if bins[b] == _EMPTY or value < bins[b]:
+            bins[b] = value
+
+    for b in range(NUM_BINS):
+        if bins[b] == _EMPTY:
+            offset = 1
+            while bins[(b + offset) % NUM_BINS] == _EMPTY:
+                offset += 1
+            bins[b] = (bins[(b + offset) % NUM_BINS] * NUM_BINS + offset) & _MASK64
+    return bins
+
+
+def pack_signature(sig: Optional[List[int]]) -> Optional[str]:
+    """Compact JSON-safe form of a signature (None stays None)"""
+    return base64.b64encode(_PACKED.pack(*sig)).decode('ascii') if sig is not None else None
+
+
+def unpack_signature(packed: Optional[str]) -> Optional[List[int]]:
+    """Inverse of pack_signature"""
+    return list(_PACKED.unpack(base64.b64decode(packed))) if packed is not None else None
+
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_BINS
+
+
+def find_clusters(
+    signatures: List[Optional[List[int]]],
+    groups: List[str],
+    threshold: float = DUPLICATE_THRESHOLD
+) -> List[Tuple[List[int], float]]:
+    """
+    Clusters of near-duplicate documents as ([doc_index, ...], min_similarity).
+    Only documents in the same group (e.g. resource type) are compared, and
+    only when LSH puts them in a common band bucket. Clusters are the
+    connected components of pairs at or above threshold.
+    """
+    parent = list(range(len(signatures)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets: Dict[Any, List[int]] = {}
+    for i, sig in enumerate(signatures):
+        if sig is None:
+            continue
+        for band in range(LSH_BANDS):
+            key = (groups[i], band, tuple(sig[band * LSH_ROWS:(band + 1) * LSH_ROWS]))
+            buckets.setdefault(key, []).append(i)
+
+    pair_similarity: Dict[Tuple[int, int], float] = {}
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pair = (members[x], members[y])
+                if pair in pair_similarity:
+                    continue
+                pair_similarity[pair] = similarity(signatures[pair[0]], signatures[pair[1]])
+                if pair_similarity[pair] >= threshold:
+                    parent[find(pair[0])] = find(pair[1])
+
+    components: Dict[int, List[int]] = {}
+    for i in range(len(signatures)):
+        components.setdefault(find(i), []).append(i)
+
+    clusters = []
+    for members in components.values():
+        if len(members) < 2:
+            continue
+        member_set = set(members)
+        scores = [s for (a, b), s in pair_similarity.items()
+                  if s >= threshold and a in member_set and b in member_set]
+        clusters.append((members, min(scores)))
+    return clusters
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""
+Globs
+Path glob helpers shared by the index_builder scanner and the applyTo
+resolver: glob -> regex translation, brace expansion and splitting of
+frontmatter pattern lists
+"""
+
+import re
+from typing import Any, List
+
+BRACE_PATTERN = re.compile(r'\{([^{}]*)\}')
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a path glob to a regex ('**' crosses directories, '*' does not)"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            out.append('(?:/.*)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            out.append('[^/]')
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(out)
+
+
+def expand_braces(pattern: str) -> List[str]:
+    """Expand {a,b} alternatives: '**/*.{ts,tsx}' -> ['**/*.ts', '**/*.tsx']"""
+    match = BRACE_PATTERN.search(pattern)
+    if not match:
+        return [pattern]
+
+    expanded = []
+    for option in match.group(1).split(','):
+        expanded.extend(expand_braces(pattern[:match.start()] + option.strip() + pattern[match.end():]))
+    return expanded
+
+
+def split_patterns(value: Any) -> List[str]:
+    """
+    Glob list from a frontmatter value: a list, or a string such as
+    "**/*.ts, **/*.tsx" or "['*']". Commas inside braces do not split.
+    """
+    if isinstance(value, list):
+        items = [str(v) for v in value]
+    else:
+        text = str(value or '').strip()
+        if text.startswith('[') and text.endswith(']'):
+            text = text[1:-1]
+        items = []
+        depth = 0
+        current = ''
+        for char in text:
+            depth += {'{': 1, '}': -1}.get(char, 0)
+            if char == ',' and depth <= 0:
+                items.append(current)
+                current = ''
+            else:
+                current += char
+        items.append(current)
+
+    patterns = []
+    for item in items:
+        item = item.strip().strip('\'"').strip()
+        if item.startswith('./'):
+            item = item[2:]
+        if item:
+            patterns.append(item.lstrip('/'))
+    return patterns
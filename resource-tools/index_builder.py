@@ -2,23 +2,87 @@
 
 """
 Resource Index Builder
-Scans .claude/skills and _reference/awesome-copilot to create lightweight indexes
+Scans the configured workspace roots (.claude/skills, .github, _reference) to
+create lightweight indexes
 This reduces AI token costs by providing metadata without full content
 """
 
+import argparse
+import hashlib
 import json
 import os
 import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+import dedupe
+import profiling
+import sqlite_backend
+import vector_index
+from apply_to import build_apply_to_index
+from atomic_file import mkstemp_for
+from globs import glob_to_regex
+from profiling import phase
+from search_index import build_name_index, build_search_index
+from sections import estimate_tokens, extract_outline_lines
+
+# Both can be overridden (e.g. to index a synthetic corpus in benchmark.py)
+WORKSPACE_DIR = Path(os.environ.get('RESOURCE_TOOLS_WORKSPACE', Path(__file__).parent.parent))  # E:\_Development
+OUTPUT_DIR = Path(os.environ.get('RESOURCE_TOOLS_INDEX_DIR', Path(__file__).parent / 'indexes'))
+MANIFEST_PATH = OUTPUT_DIR / 'manifest.json'
+MANIFEST_VERSION = 2
+SQLITE_PATH = OUTPUT_DIR / 'resources.db'
+VECTORS_PATH = OUTPUT_DIR / 'vectors.npz'
+DUPLICATES_PATH = OUTPUT_DIR / 'duplicates.json'
+HEADER_VERSION = 2
+
+# Roots are walked once each with os.scandir. Include globs are relative to the
+# root and map matching files to a category ('*' stays within one directory,
+# '**' crosses directories). Override with --config <file.json> holding
+# {"roots": [...], "exclude": [...]}.
+SCAN_ROOTS = [
+    {
+        'root': '.claude/skills',
+        'include': {'skills': ['*/SKILL.md']},
+    },
+    {
+        'root': '.github',
+        'include': {
+            'skills': ['skills/*/SKILL.md'],
+            'prompts': ['prompts/*.prompt.md'],
+            'instructions': ['instructions/*.instructions.md'],
+        },
+    },
+    {
+        'root': '_reference',
+        'include': {
+            'skills': ['*-skill/SKILL.md', 'awesome-copilot/skills/*/SKILL.md'],
+            'agents': ['awesome-copilot/agents/*.agent.md'],
+            'prompts': ['awesome-copilot/prompts/*.prompt.md'],
+            'instructions': ['*.instructions.md', 'awesome-copilot/instructions/*.instructions.md'],
+        },
+    },
+]
+
+# Excluded paths (relative to each root); matching directories are not descended
+SCAN_EXCLUDE = ['**/.git/**', '**/node_modules/**', '**/__pycache__/**', '**/.venv/**']
+
+# Frontmatter and the first paragraph are read from at most this many bytes;
+# the rest of the file is only streamed for the outline and content hash
+HEAD_MAX_BYTES = 64 * 1024
 
-WORKSPACE_DIR = Path(__file__).parent.parent  # E:\_Development
-REFERENCE_DIR = WORKSPACE_DIR / '_reference' / 'awesome-copilot'
-OUTPUT_DIR = Path(__file__).parent / 'indexes'
+# Worker threads used to read and parse files
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Seconds between polls of the scan roots in --watch mode
+WATCH_INTERVAL = 0.5
 
 # Ensure output directory exists
-OUTPUT_DIR.mkdir(exist_ok=True)
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def parse_frontmatter(content: str) -> Dict[str, Any]:
@@ -65,154 +129,574 @@ def extract_summary(content: str, max_length: int = 200) -> str:
     return ''
 
 
-def index_claude_skills() -> List[Dict[str, Any]]:
-    """Index Claude skills from .claude/skills"""
-    skills_dir = WORKSPACE_DIR / '.claude' / 'skills'
-    if not skills_dir.exists():
-        print('No .claude/skills directory found')
-        return []
+def _relative_path(file_path: Path) -> str:
+    """Workspace-relative path with forward slashes (the key used in every index)"""
+    return str(file_path.relative_to(WORKSPACE_DIR)).replace('\\', '/')
+
+
+def _display_path(path: Path) -> str:
+    """Path relative to the workspace for output, absolute if outside it"""
+    try:
+        return str(path.relative_to(WORKSPACE_DIR))
+    except ValueError:
+        return str(path)
+
+
+def _parse_tags(frontmatter: Dict[str, Any]) -> List[str]:
+    """Split a comma-separated tags field"""
+    return [t.strip() for t in frontmatter.get('tags', '').split(',')] if frontmatter.get('tags') else []
+
+
+def _compile_glob(pattern: str):
+    """Compiled full-path matcher plus per-segment matchers used for pruning"""
+    segments = [
+        None if seg == '**' else re.compile(glob_to_regex(seg), re.IGNORECASE)
+        for seg in pattern.split('/')
+    ]
+    return re.compile(glob_to_regex(pattern), re.IGNORECASE), segments
+
+
+def _could_match_below(segments: List[Any], dir_parts: List[str]) -> bool:
+    """Whether files under a directory (given as path parts) could match the glob"""
+    for i, part in enumerate(dir_parts):
+        if i >= len(segments) - 1:
+            return False
+        if segments[i] is None:
+            return True
+        if not segments[i].fullmatch(part):
+            return False
+    return True
+
+
+def discover_files(
+    roots: Optional[List[Dict[str, Any]]] = None,
+    exclude: Optional[List[str]] = None,
+    report_missing: bool = True
+) -> Dict[str, List[Path]]:
+    """
+    Walk each configured root once with os.scandir and return category -> files.
+    Directories that are excluded, or that no include glob can reach, are pruned
+    before descending. Files are sorted per category for stable output.
+    """
+    roots = SCAN_ROOTS if roots is None else roots
+    excludes = [_compile_glob(p)[0] for p in (SCAN_EXCLUDE if exclude is None else exclude)]
+    found: Dict[str, List[Path]] = {category: [] for category in CATEGORIES}
+    seen = set()
+
+    for root_config in roots:
+        root = WORKSPACE_DIR / root_config['root']
+        if not root.is_dir():
+            if report_missing:
+                print(f'No {root_config["root"]} directory found')
+            continue
 
-    skills = []
+        rules = [
+            (category, *_compile_glob(pattern))
+            for category, patterns in root_config['include'].items()
+            for pattern in patterns
+        ]
+
+        stack: List[Tuple[str, List[str]]] = [(str(root), [])]
+        while stack:
+            dir_path, dir_parts = stack.pop()
+            try:
+                entries = list(os.scandir(dir_path))
+            except OSError as e:
+                print(f'Error scanning {dir_path}: {e}')
+                continue
+
+            for entry in entries:
+                parts = dir_parts + [entry.name]
+                rel = '/'.join(parts)
+                if any(ex.fullmatch(rel) for ex in excludes):
+                    continue
+
+                if entry.is_dir(follow_symlinks=False):
+                    if any(_could_match_below(segments, parts) for _, _, segments in rules):
+                        stack.append((entry.path, parts))
+                    continue
+
+                for category, regex, _ in rules:
+                    if regex.fullmatch(rel):
+                        if entry.path not in seen:
+                            seen.add(entry.path)
+                            found[category].append(Path(entry.path))
+                        break
+
+    for files in found.values():
+        files.sort()
+    return found
+
+
+def load_scan_config(config_path: Path) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Read scan roots and exclude globs from a JSON config file"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return config.get('roots', SCAN_ROOTS), config.get('exclude', SCAN_EXCLUDE)
+
+
+def make_skill_entry(skill_file: Path, head: str, size: int) -> Dict[str, Any]:
+    """Build the index entry for a Claude skill"""
+    frontmatter = parse_frontmatter(head)
+    summary = extract_summary(head)
+
+    return {
+        'name': frontmatter.get('name', skill_file.parent.name),
+        'description': frontmatter.get('description', summary),
+        'type': 'claude-skill',
+        'path': _relative_path(skill_file),
+        'tags': _parse_tags(frontmatter),
+        'size': size
+    }
 
-    for skill_dir in skills_dir.iterdir():
-        if not skill_dir.is_dir():
-            continue
 
-        skill_file = skill_dir / 'SKILL.md'
-        if not skill_file.exists():
-            continue
+def make_agent_entry(agent_file: Path, head: str, size: int) -> Dict[str, Any]:
+    """Build the index entry for a Copilot agent"""
+    frontmatter = parse_frontmatter(head)
+
+    # Parse tools array
+    tools = []
+    if 'tools' in frontmatter:
+        tools_str = frontmatter['tools'].strip()
+        if tools_str.startswith('[') and tools_str.endswith(']'):
+            # Parse JSON-like array
+            tools_str = tools_str.replace("'", '"')
+            try:
+                tools = json.loads(tools_str)
+            except:
+                # Fallback to simple split
+                tools = [t.strip().strip('"').strip("'") for t in tools_str[1:-1].split(',')]
+
+    return {
+        'name': frontmatter.get('name', agent_file.stem.replace('.agent', '')),
+        'description': frontmatter.get('description', ''),
+        'type': 'copilot-agent',
+        'path': _relative_path(agent_file),
+        'tools': tools,
+        'size': size
+    }
 
-        try:
-            content = skill_file.read_text(encoding='utf-8')
-            frontmatter = parse_frontmatter(content)
-            summary = extract_summary(content)
 
-            skills.append({
-                'name': frontmatter.get('name', skill_dir.name),
-                'description': frontmatter.get('description', summary),
-                'type': 'claude-skill',
-                'path': str(skill_file.relative_to(WORKSPACE_DIR)).replace('\\', '/'),
-                'tags': [t.strip() for t in frontmatter.get('tags', '').split(',')] if frontmatter.get('tags') else [],
-                'size': len(content.encode('utf-8'))
-            })
-        except Exception as e:
-            print(f'Error processing {skill_file}: {e}')
+def make_prompt_entry(prompt_file: Path, head: str, size: int) -> Dict[str, Any]:
+    """Build the index entry for a Copilot prompt"""
+    frontmatter = parse_frontmatter(head)
 
-    return skills
+    return {
+        'name': frontmatter.get('name', prompt_file.stem.replace('.prompt', '')),
+        'description': frontmatter.get('description', ''),
+        'type': 'copilot-prompt',
+        'path': _relative_path(prompt_file),
+        'tags': _parse_tags(frontmatter),
+        'size': size
+    }
 
 
-def index_agents() -> List[Dict[str, Any]]:
-    """Index agents from .github/awesome-copilot-main/agents"""
-    agents_dir = REFERENCE_DIR / 'agents'
-    if not agents_dir.exists():
-        print('No agents directory found')
-        return []
+def make_instruction_entry(instruction_file: Path, head: str, size: int) -> Dict[str, Any]:
+    """Build the index entry for a Copilot instruction"""
+    frontmatter = parse_frontmatter(head)
 
-    agents = []
+    return {
+        'name': frontmatter.get('name', re.sub(r'\.instructions?$', '', instruction_file.stem)),
+        'description': frontmatter.get('description', ''),
+        'type': 'copilot-instruction',
+        'path': _relative_path(instruction_file),
+        'appliesTo': frontmatter.get('appliesTo', frontmatter.get('applyTo', frontmatter.get('patterns', ''))),
+        'size': size
+    }
 
-    for agent_file in agents_dir.glob('*.agent.md'):
-        try:
-            content = agent_file.read_text(encoding='utf-8')
-            frontmatter = parse_frontmatter(content)
-
-            # Parse tools array
-            tools = []
-            if 'tools' in frontmatter:
-                tools_str = frontmatter['tools'].strip()
-                if tools_str.startswith('[') and tools_str.endswith(']'):
-                    # Parse JSON-like array
-                    tools_str = tools_str.replace("'", '"')
-                    try:
-                        tools = json.loads(tools_str)
-                    except:
-                        # Fallback to simple split
-                        tools = [t.strip().strip('"').strip("'") for t in tools_str[1:-1].split(',')]
-
-            agents.append({
-                'name': frontmatter.get('name', agent_file.stem.replace('.agent', '')),
-                'description': frontmatter.get('description', ''),
-                'type': 'copilot-agent',
-                'path': str(agent_file.relative_to(WORKSPACE_DIR)).replace('\\', '/'),
-                'tools': tools,
-                'size': len(content.encode('utf-8'))
-            })
-        except Exception as e:
-            print(f'Error processing {agent_file}: {e}')
-
-    return agents
 
+def scan_file(file_path: Path, with_hash: bool = True) -> Tuple[str, List[Dict[str, Any]], Optional[str]]:
+    """
+    Stream a file once in constant memory.
+    Returns (head, outline, sha256) where head is the frontmatter block and the
+    first summary paragraph (capped at HEAD_MAX_BYTES) for parse_frontmatter()
+    and extract_summary(); the hash is computed chunk by chunk unless disabled.
+    """
+    hasher = hashlib.sha256() if with_hash else None
+    head_lines: List[bytes] = []
+    paragraph: List[bytes] = []
+    state = {'head_bytes': 0, 'done': False, 'frontmatter': False, 'first': True}
+
+    def collect_head(line: bytes):
+        head_lines.append(line)
+        state['head_bytes'] += len(line)
+        if state['head_bytes'] >= HEAD_MAX_BYTES:
+            state['done'] = True
+            return
+
+        if state['first']:
+            state['first'] = False
+            state['frontmatter'] = line.startswith(b'---')
+            if state['frontmatter']:
+                return
+        if state['frontmatter']:
+            if line.startswith(b'---'):
+                state['frontmatter'] = False
+            return
+
+        # Stop after the first paragraph extract_summary() would accept
+        if line.rstrip(b'\r\n'):
+            paragraph.append(line)
+            return
+        if paragraph:
+            cleaned = b''.join(paragraph).decode('utf-8', errors='replace').strip().lstrip('#').strip()
+            if cleaned and not cleaned.startswith('```'):
+                state['done'] = True
+            paragraph.clear()
+
+    def lines():
+        with open(file_path, 'rb') as f:
+            for line in f:
+                if hasher:
+                    hasher.update(line)
+                if not state['done']:
+                    collect_head(line)
+                yield line
+
+    outline = extract_outline_lines(lines())
+    head = b''.join(head_lines).decode('utf-8').replace('\r\n', '\n')
+    return head, outline, hasher.hexdigest() if hasher else None
+
+
+# category -> (build entry, label used in build output)
+CATEGORIES = {
+    'skills': (make_skill_entry, 'Claude skills'),
+    'agents': (make_agent_entry, 'Copilot agents'),
+    'prompts': (make_prompt_entry, 'Copilot prompts'),
+    'instructions': (make_instruction_entry, 'Copilot instructions'),
+}
+
+
+def _index_file(
+    category: str,
+    file_path: Path,
+    known: Optional[Dict[str, Any]] = None,
+    previous_entry: Optional[Dict[str, Any]] = None,
+    previous_outline: Optional[List[Dict[str, Any]]] = None,
+    with_hash: bool = True
+):
+    """
+    Index one file. Returns (entry, outline, fingerprint, status) where status
+    is 'added', 'changed' or 'unchanged'; (None, None, None, 'error') on failure.
+    A file whose fingerprint matches 'known' reuses the previous entry/outline.
+    Size comes from stat(); the content is streamed, never held in memory.
+    """
+    make_entry = CATEGORIES[category][0]
+    try:
+        stat = file_path.stat()
+        reusable = known is not None and previous_entry is not None and \
+            previous_outline is not None and known['category'] == category
+
+        # Cheap check first: same mtime and size means the file was not touched
+        if reusable and known['mtime'] == stat.st_mtime and known['size'] == stat.st_size:
+            return previous_entry, previous_outline, known, 'unchanged'
+
+        head, outline, content_hash = scan_file(file_path, with_hash)
+        profiling.add_bytes(stat.st_size)
+        fingerprint = {
+            'category': category,
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'hash': content_hash
+        }
 
-def index_prompts() -> List[Dict[str, Any]]:
-    """Index prompts from .github/awesome-copilot-main/prompts"""
-    prompts_dir = REFERENCE_DIR / 'prompts'
-    if not prompts_dir.exists():
-        print('No prompts directory found')
-        return []
+        # Touched but identical content (e.g. re-synced): keep the entry
+        if reusable and content_hash and known.get('hash') == content_hash:
+            if 'minhash' in known:
+                fingerprint['minhash'] = known['minhash']
+            return previous_entry, previous_outline, fingerprint, 'unchanged'
 
-    prompts = []
+        entry = make_entry(file_path, head, stat.st_size)
+        entry['tokens'] = estimate_tokens(stat.st_size)
+        return entry, outline, fingerprint, 'changed' if known else 'added'
+    except Exception as e:
+        print(f'Error processing {file_path}: {e}')
+        return None, None, None, 'error'
 
-    for prompt_file in prompts_dir.glob('*.prompt.md'):
-        try:
-            content = prompt_file.read_text(encoding='utf-8')
-            frontmatter = parse_frontmatter(content)
 
-            prompts.append({
-                'name': frontmatter.get('name', prompt_file.stem.replace('.prompt', '')),
-                'description': frontmatter.get('description', ''),
-                'type': 'copilot-prompt',
-                'path': str(prompt_file.relative_to(WORKSPACE_DIR)).replace('\\', '/'),
-                'tags': [t.strip() for t in frontmatter.get('tags', '').split(',')] if frontmatter.get('tags') else [],
-                'size': len(content.encode('utf-8'))
-            })
-        except Exception as e:
-            print(f'Error processing {prompt_file}: {e}')
+def _index_category(category: str) -> List[Dict[str, Any]]:
+    """Read and parse every file of one category"""
+    files = discover_files()[category]
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        results = pool.map(lambda f: _index_file(category, f), files)
+    return [entry for entry, _, _, _ in results if entry is not None]
+
 
-    return prompts
+def index_claude_skills() -> List[Dict[str, Any]]:
+    """Index Claude skills (SKILL.md files)"""
+    return _index_category('skills')
+
+
+def index_agents() -> List[Dict[str, Any]]:
+    """Index Copilot agents (*.agent.md)"""
+    return _index_category('agents')
+
+
+def index_prompts() -> List[Dict[str, Any]]:
+    """Index Copilot prompts (*.prompt.md)"""
+    return _index_category('prompts')
 
 
 def index_instructions() -> List[Dict[str, Any]]:
-    """Index instructions from .github/awesome-copilot-main/instructions"""
-    instructions_dir = REFERENCE_DIR / 'instructions'
-    if not instructions_dir.exists():
-        print('No instructions directory found')
-        return []
+    """Index Copilot instructions (*.instructions.md)"""
+    return _index_category('instructions')
 
-    instructions = []
 
-    for instruction_file in instructions_dir.glob('*.instruction.md'):
-        try:
-            content = instruction_file.read_text(encoding='utf-8')
-            frontmatter = parse_frontmatter(content)
+def load_manifest() -> Dict[str, Dict[str, Any]]:
+    """Load the incremental build manifest (path -> mtime, size, hash, category[, minhash])"""
+    if not MANIFEST_PATH.exists():
+        return {}
 
-            instructions.append({
-                'name': frontmatter.get('name', instruction_file.stem.replace('.instruction', '')),
-                'description': frontmatter.get('description', ''),
-                'type': 'copilot-instruction',
-                'path': str(instruction_file.relative_to(WORKSPACE_DIR)).replace('\\', '/'),
-                'appliesTo': frontmatter.get('appliesTo', frontmatter.get('patterns', '')),
-                'size': len(content.encode('utf-8'))
-            })
-        except Exception as e:
-            print(f'Error processing {instruction_file}: {e}')
+    try:
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-    return instructions
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
 
 
-def build_index():
-    """Build master index"""
-    print('Building resource index...\n')
+def _load_previous_entries() -> Dict[str, Dict[str, Any]]:
+    """Map path -> entry from the existing master index (empty if missing)"""
+    index_path = OUTPUT_DIR / 'master-index.json'
+    if not index_path.exists():
+        return {}
 
-    skills = index_claude_skills()
-    print(f'[OK] Indexed {len(skills)} Claude skills')
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            master_index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    previous = {
+        entry['path']: {key: value for key, value in entry.items() if key != 'aliases'}
+        for entries in master_index.get('resources', {}).values()
+        for entry in entries
+    }
 
-    agents = index_agents()
-    print(f'[OK] Indexed {len(agents)} Copilot agents')
+    # Entries collapsed into a canonical one by the last --dedupe build
+    try:
+        with open(DUPLICATES_PATH, 'r', encoding='utf-8') as f:
+            duplicates = json.load(f)
+        if duplicates.get('generatedAt') == master_index.get('generatedAt'):
+            for cluster in duplicates['clusters']:
+                for entry in cluster['aliases']:
+                    previous[entry['path']] = entry
+    except (OSError, ValueError, KeyError):
+        pass
+
+    return previous
+
+
+def _read_body(resource: Dict[str, Any]) -> str:
+    """Full text of an indexed file (empty if it cannot be read)"""
+    try:
+        body = (WORKSPACE_DIR / resource['path']).read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return ''
+    profiling.add_bytes(len(body.encode('utf-8')))
+    return body
+
+
+def _canonical_rank(entry: Dict[str, Any]) -> Tuple[bool, int, str]:
+    """Sort key picking a cluster's canonical entry: workspace copies before _reference, then shallowest path"""
+    return entry['path'].startswith('_reference/'), entry['path'].count('/'), entry['path']
+
+
+def _signature(entry: Dict[str, Any], fingerprint: Optional[Dict[str, Any]]) -> Optional[List[int]]:
+    """
+    MinHash signature of a resource body. It is kept in the file's manifest
+    fingerprint ('minhash'), which follows the file while its mtime and size
+    or content hash are unchanged, so only new or edited files are read.
+    """
+    if fingerprint is not None and 'minhash' in fingerprint:
+        return dedupe.unpack_signature(fingerprint['minhash'])
+    sig = dedupe.signature(_read_body(entry))
+    if fingerprint is not None:
+        fingerprint['minhash'] = dedupe.pack_signature(sig)
+    return sig
+
+
+def collapse_duplicates(
+    resources: Dict[str, List[Dict[str, Any]]],
+    fingerprints: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Find near-duplicate resources of the same type (MinHash/LSH over body
+    shingles) and keep one canonical entry per cluster, listing the others
+    under 'aliases' ({name, path}).
+    fingerprints (path -> manifest entry) cache the signatures between builds.
+    Returns (resources without the aliases, clusters) where each cluster is
+    {canonical, similarity, aliases: [full alias entries]}.
+    """
+    fingerprints = fingerprints or {}
+    entries = [entry for category in CATEGORIES for entry in resources[category]]
+    signatures = [_signature(entry, fingerprints.get(entry['path'])) for entry in entries]
+
+    replaced = {}
+    dropped = set()
+    clusters = []
+    for members, similarity in dedupe.find_clusters(signatures, [e['type'] for e in entries]):
+        canonical, *aliases = sorted((entries[i] for i in members), key=_canonical_rank)
+        replaced[canonical['path']] = {
+            **canonical,
+            'aliases': [{'name': alias['name'], 'path': alias['path']} for alias in aliases]
+        }
+        dropped.update(alias['path'] for alias in aliases)
+        clusters.append({'canonical': canonical['path'], 'similarity': round(similarity, 3), 'aliases': aliases})
 
-    prompts = index_prompts()
-    print(f'[OK] Indexed {len(prompts)} Copilot prompts')
+    clusters.sort(key=lambda cluster: cluster['canonical'])
+    return {
+        category: [replaced.get(e['path'], e) for e in entries if e['path'] not in dropped]
+        for category, entries in resources.items()
+    }, clusters
 
-    instructions = index_instructions()
-    print(f'[OK] Indexed {len(instructions)} Copilot instructions')
+
+def _load_previous_outlines() -> Dict[str, List[Dict[str, Any]]]:
+    """Map path -> heading outline from the existing sections index (empty if missing)"""
+    sections_path = OUTPUT_DIR / 'sections-index.json'
+    if not sections_path.exists():
+        return {}
+
+    try:
+        with open(sections_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('resources', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: Path, data: Any):
+    """
+    Write bytes or text to a temporary file next to path and rename it into
+    place, so concurrent readers see either the old file or the new one.
+    The temporary name is unique, so concurrent builders (e.g. --watch and a
+    manual rebuild) never write into each other's file.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    fd, tmp_name = mkstemp_for(path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _serialize_master(master_index: Dict[str, Any]):
+    """
+    Serialize the master index compactly, recording the byte (offset, length)
+    of each category's resource array so readers can load one shard by seeking.
+    """
+    head = {k: v for k, v in master_index.items() if k != 'resources'}
+    parts = [json.dumps(head)[:-1].encode('utf-8'), b', "resources": {']
+    position = sum(len(p) for p in parts)
+    ranges = {}
+
+    for i, (category, entries) in enumerate(master_index['resources'].items()):
+        key = (', ' if i else '') + json.dumps(category) + ': '
+        body = json.dumps(entries).encode('utf-8')
+        parts.append(key.encode('utf-8'))
+        position += len(parts[-1])
+        ranges[category] = (position, len(body))
+        parts.append(body)
+        position += len(body)
+
+    parts.append(b'}}')
+    return b''.join(parts), ranges
+
+
+def build_index(
+    incremental: bool = False,
+    sqlite: bool = False,
+    roots: Optional[List[Dict[str, Any]]] = None,
+    exclude: Optional[List[str]] = None,
+    with_hash: bool = True,
+    vectors: bool = False,
+    collapse: bool = False
+):
+    """
+    Build master index.
+    Files are discovered with one os.scandir walk per root and parsed in a
+    thread pool. With incremental=True, only files added, changed or deleted
+    since the last build (per indexes/manifest.json) are re-parsed; everything
+    else is patched in from the existing indexes.
+    With sqlite=True, also write indexes/resources.db (rows + FTS5 over body text).
+    With vectors=True, also write indexes/vectors.npz (TF-IDF, needs NumPy).
+    With collapse=True, near-duplicate resources are folded into one entry with
+    'aliases' and the clusters are written to indexes/duplicates.json.
+    With with_hash=False, change detection relies on mtime and size only.
+    """
+    print('Building resource index...\n')
+
+    with phase('loadPrevious'):
+        manifest = load_manifest() if incremental else {}
+        previous = _load_previous_entries() if incremental else {}
+        if incremental and not (manifest and previous):
+            print('No usable manifest or master index found, doing a full build\n')
+            incremental = False
+        previous_outlines = _load_previous_outlines() if incremental else {}
+
+    with phase('discover'):
+        files = discover_files(roots, exclude)
+    tasks = [(category, file_path) for category, paths in files.items() for file_path in paths]
+
+    def run(task):
+        category, file_path = task
+        rel_path = _relative_path(file_path)
+        start = time.perf_counter()
+        result = _index_file(
+            category, file_path,
+            manifest.get(rel_path), previous.get(rel_path), previous_outlines.get(rel_path), with_hash
+        )
+        # Summed over worker threads, so per-category time can exceed wall time
+        profiling.record(f'scan.{category}', time.perf_counter() - start)
+        return category, result
+
+    with phase('scan'), ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        results = list(pool.map(run, tasks))
+
+    resources = {category: [] for category in CATEGORIES}
+    outlines = {}
+    new_manifest = {}
+    counts = {'added': 0, 'changed': 0, 'unchanged': 0, 'error': 0}
+
+    for category, (entry, outline, fingerprint, status) in results:
+        counts[status] += 1
+        if entry is None:
+            continue
+        resources[category].append(entry)
+        outlines[entry['path']] = outline
+        new_manifest[entry['path']] = fingerprint
+
+    for category, (_, label) in CATEGORIES.items():
+        print(f'[OK] Indexed {len(resources[category])} {label}')
+
+    if incremental:
+        deleted = len(set(manifest) - set(new_manifest))
+        print(f'[OK] Incremental: {counts["added"]} added, {counts["changed"]} changed, '
+              f'{deleted} deleted, {counts["unchanged"]} unchanged')
+
+    clusters = None
+    if collapse:
+        with phase('dedupe'):
+            resources, clusters = collapse_duplicates(resources, new_manifest)
+        collapsed = sum(len(cluster['aliases']) for cluster in clusters)
+        print(f'[OK] Collapsed {collapsed} near-duplicates into {len(clusters)} canonical entries')
+        for cluster in clusters:
+            aliases = ', '.join(alias['path'] for alias in cluster['aliases'])
+            print(f'  {cluster["canonical"]} <- {aliases} ({cluster["similarity"]})')
+
+    skills = resources['skills']
+    agents = resources['agents']
+    prompts = resources['prompts']
+    instructions = resources['instructions']
 
     master_index = {
         'generatedAt': datetime.utcnow().isoformat() + 'Z',
@@ -233,17 +717,101 @@ def build_index():
 
     # Write master index
     index_path = OUTPUT_DIR / 'master-index.json'
-    with open(index_path, 'w', encoding='utf-8') as f:
-        json.dump(master_index, f, indent=2)
-    print(f'\n[OK] Master index written to {index_path.relative_to(WORKSPACE_DIR)}')
+    with phase('writeMaster'):
+        master_bytes, shard_ranges = _serialize_master(master_index)
+        _write_atomic(index_path, master_bytes)
+    print(f'\n[OK] Master index written to {_display_path(index_path)}')
 
     # Write separate indexes for faster lookups
-    (OUTPUT_DIR / 'skills-index.json').write_text(json.dumps(skills, indent=2), encoding='utf-8')
-    (OUTPUT_DIR / 'agents-index.json').write_text(json.dumps(agents, indent=2), encoding='utf-8')
-    (OUTPUT_DIR / 'prompts-index.json').write_text(json.dumps(prompts, indent=2), encoding='utf-8')
-    (OUTPUT_DIR / 'instructions-index.json').write_text(json.dumps(instructions, indent=2), encoding='utf-8')
-
-    print('[OK] Separate indexes written\n')
+    with phase('writeShards'):
+        _write_atomic(OUTPUT_DIR / 'skills-index.json', json.dumps(skills))
+        _write_atomic(OUTPUT_DIR / 'agents-index.json', json.dumps(agents))
+        _write_atomic(OUTPUT_DIR / 'prompts-index.json', json.dumps(prompts))
+        _write_atomic(OUTPUT_DIR / 'instructions-index.json', json.dumps(instructions))
+
+    print('[OK] Separate indexes written')
+
+    # Write inverted index for ranked search
+    all_resources = skills + agents + prompts + instructions
+    with phase('searchIndex'):
+        search_index = build_search_index(all_resources, master_index['generatedAt'])
+        _write_atomic(OUTPUT_DIR / 'search-index.json', json.dumps(search_index))
+    print(f'[OK] Search index written ({len(search_index["postings"])} terms)')
+
+    # Write trigram index over names for fuzzy lookups
+    with phase('nameIndex'):
+        name_index = build_name_index(all_resources, master_index['generatedAt'])
+        _write_atomic(OUTPUT_DIR / 'names-index.json', json.dumps(name_index))
+    print(f'[OK] Name index written ({len(name_index["keys"])} names)')
+
+    # Write applyTo globs of instructions, bucketed for instructions_for(path)
+    with phase('applyToIndex'):
+        apply_to_index = build_apply_to_index(instructions, master_index['generatedAt'])
+        _write_atomic(OUTPUT_DIR / 'applyto-index.json', json.dumps(apply_to_index))
+    print(f'[OK] ApplyTo index written ({len(apply_to_index["instructions"])} instructions)')
+
+    # Write heading outlines (byte offsets) for section-level loading
+    with phase('sectionsIndex'):
+        _write_atomic(
+            OUTPUT_DIR / 'sections-index.json',
+            json.dumps({'generatedAt': master_index['generatedAt'], 'resources': outlines})
+        )
+    print(f'[OK] Sections index written ({sum(len(o) for o in outlines.values())} sections)')
+
+    if sqlite:
+        with phase('sqlite'):
+            sqlite_backend.write_database(
+                SQLITE_PATH, all_resources, _read_body, master_index['generatedAt'], master_index['stats']
+            )
+        print(f'[OK] SQLite index written to {_display_path(SQLITE_PATH)}')
+
+    if vectors:
+        try:
+            vector_index.require_numpy()
+        except RuntimeError:
+            print('[!] NumPy not installed: vector index skipped (pip install numpy)')
+        else:
+            with phase('vectors'):
+                terms = vector_index.write_vector_index(
+                    VECTORS_PATH, all_resources, _read_body, master_index['generatedAt']
+                )
+            print(f'[OK] Vector index written to {_display_path(VECTORS_PATH)} ({terms} terms)')
+
+    # Write header last: stats plus where each type's shard sits in master-index.json
+    # The master index's size and mtime let readers detect a master rewritten
+    # without a matching header (index-builder.js, or a build that failed here)
+    master_stat = index_path.stat()
+    header = {
+        'version': HEADER_VERSION,
+        'generatedAt': master_index['generatedAt'],
+        'master': {'size': master_stat.st_size, 'mtimeNs': master_stat.st_mtime_ns},
+        'stats': master_index['stats'],
+        'shards': {
+            category: {
+                'file': f'{category}-index.json',
+                'count': len(resources[category]),
+                'offset': shard_ranges[category][0],
+                'length': shard_ranges[category][1]
+            }
+            for category in CATEGORIES
+        }
+    }
+    _write_atomic(OUTPUT_DIR / 'header-index.json', json.dumps(header))
+    print('[OK] Header written')
+
+    # Duplicate clusters (also supply the collapsed entries to incremental builds)
+    if clusters is not None:
+        _write_atomic(
+            DUPLICATES_PATH,
+            json.dumps({'generatedAt': master_index['generatedAt'], 'clusters': clusters}, indent=2)
+        )
+        print(f'[OK] Duplicate clusters written to {_display_path(DUPLICATES_PATH)}')
+    elif DUPLICATES_PATH.exists():
+        DUPLICATES_PATH.unlink()
+
+    # Write manifest for the next incremental build
+    _write_atomic(MANIFEST_PATH, json.dumps({'version': MANIFEST_VERSION, 'files': new_manifest}))
+    print('[OK] Manifest written\n')
 
     # Print statistics
     total_size = sum(r['size'] for r in skills + agents + prompts + instructions)
@@ -256,5 +824,109 @@ def build_index():
     print(f'  Space savings: {(1 - index_size / total_size) * 100:.1f}%')
 
 
+def snapshot_files(
+    roots: Optional[List[Dict[str, Any]]] = None,
+    exclude: Optional[List[str]] = None
+) -> Dict[str, Tuple[int, int]]:
+    """(mtime_ns, size) of every file a build would index, by path"""
+    snapshot = {}
+    for paths in discover_files(roots, exclude, report_missing=False).values():
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            snapshot[str(path)] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def watch(
+    interval: float = WATCH_INTERVAL,
+    roots: Optional[List[Dict[str, Any]]] = None,
+    exclude: Optional[List[str]] = None,
+    **build_options
+):
+    """
+    Keep the indexes live: poll the scan roots every interval seconds and run an
+    incremental build as soon as a file is added, changed or removed. The
+    snapshot is taken before each build, so edits made while it runs are picked
+    up by the next poll. A failed build (e.g. a PermissionError from os.replace
+    while a reader holds an index open on Windows) is reported and retried on
+    the next poll. Runs until interrupted (Ctrl+C).
+    """
+    # Files as of the last successful build (None until the first one)
+    snapshot: Optional[Dict[str, Tuple[int, int]]] = None
+    print(f'Watching for changes every {interval}s (Ctrl+C to stop)\n')
+
+    try:
+        while True:
+            current = snapshot_files(roots, exclude)
+            if snapshot is not None:
+                if current == snapshot:
+                    time.sleep(interval)
+                    continue
+                changed = [p for p in current if snapshot.get(p) != current[p]]
+                removed = [p for p in snapshot if p not in current]
+                print(f'[{datetime.now():%H:%M:%S}] {len(changed)} added or changed, {len(removed)} removed: '
+                      + ', '.join(_relative_path(Path(p)) for p in (changed + removed)[:5])
+                      + (', ...' if len(changed) + len(removed) > 5 else ''))
+
+            start = time.perf_counter()
+            try:
+                build_index(incremental=True, roots=roots, exclude=exclude, **build_options)
+            except Exception as e:
+                print(f'[!] Build failed ({type(e).__name__}: {e}); retrying on the next poll\n')
+            else:
+                snapshot = current
+                print(f'[OK] Indexes updated in {time.perf_counter() - start:.2f}s, '
+                      f'watching {len(current)} files\n')
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print('Stopped watching')
+
+
+def main():
+    """CLI interface"""
+    # CPU time spent so far: interpreter startup plus imports
+    startup_seconds = time.process_time()
+
+    parser = argparse.ArgumentParser(description='Build lightweight resource indexes')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only re-parse files added, changed or deleted since the last build')
+    parser.add_argument('--sqlite', action='store_true',
+                        help='Also write indexes/resources.db (SQLite with FTS5 over body text)')
+    parser.add_argument('--vectors', action='store_true',
+                        help='Also write indexes/vectors.npz (TF-IDF over body text, requires NumPy)')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='Collapse near-duplicate resources into one entry with aliases')
+    parser.add_argument('--no-hash', action='store_true',
+                        help='Skip content hashing (incremental builds compare mtime and size only)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and update the indexes incrementally whenever a resource file changes')
+    parser.add_argument('--interval', type=float, default=WATCH_INTERVAL,
+                        help=f'Seconds between polls in --watch mode (default: {WATCH_INTERVAL})')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print a JSON timing breakdown (per phase and category, bytes read) to stderr')
+    parser.add_argument('--profile-dump', type=Path,
+                        help='With --profile, also write cProfile stats to this file')
+    parser.add_argument('--config', type=Path,
+                        help='JSON file with scan "roots" and "exclude" globs (default: SCAN_ROOTS)')
+
+    args = parser.parse_args()
+    if args.profile:
+        profiling.start(args.profile_dump)
+        profiling.record('startup', startup_seconds)
+
+    roots, exclude = load_scan_config(args.config) if args.config else (None, None)
+    options = dict(sqlite=args.sqlite, with_hash=not args.no_hash, vectors=args.vectors, collapse=args.dedupe)
+    if args.watch:
+        watch(args.interval, roots, exclude, **options)
+    else:
+        build_index(incremental=args.incremental, roots=roots, exclude=exclude, **options)
+
+    if args.profile:
+        print(json.dumps(profiling.stop(), indent=2), file=sys.stderr)
+
+
 if __name__ == '__main__':
-    build_index()
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+"""
+MCP Server for Resource Tools (Python)
+Long-running JSON-RPC stdio server exposing the same tools as mcp-server.js
+Indexes and loaded content stay resident, so lookups skip interpreter startup
+and JSON parsing after the first request
+"""
+
+import json
+import sys
+import time
+from typing import Dict, Any, Optional
+
+from resource_loader import (
+    TYPE_MAP,
+    search_resources,
+    get_resource_by_name,
+    list_resources,
+    get_stats,
+    warm_cache
+)
+
+SERVER_NAME = 'Resource Tools MCP Server'
+SERVER_VERSION = '1.0.0'
+PROTOCOL_VERSION = '2024-11-05'
+
+RESOURCE_TYPES = list(TYPE_MAP)
+
+
+def _format_size(size: int) -> str:
+    """Human-readable size, matching mcp-server.js"""
+    return f'{size / 1024:.1f} KB'
+
+
+def _optional_fields(resource: Dict[str, Any], *fields: str) -> Dict[str, Any]:
+    """Copy fields that are present and non-empty"""
+    return {field: resource[field] for field in fields if resource.get(field)}
+
+
+class MCPResourceServer:
+    """MCP server implementation using stdio"""
+
+    def __init__(self):
+        self.tools = [
+            {
+                'name': 'search_resources',
+                'description': 'Search for skills, agents, prompts, or instructions by keyword. Returns metadata only (lightweight). Use get_resource to load full content.',
+                'inputSchema': {
+                    'type': 'object',
+                    'properties': {
+                        'query': {
+                            'type': 'string',
+                            'description': 'Search query (searches in name, tags and description)'
+                        },
+                        'type': {
+                            'type': 'string',
+                            'enum': RESOURCE_TYPES,
+                            'description': 'Filter by resource type (optional)'
+                        },
+                        'tags': {
+                            'type': 'array',
+                            'items': {'type': 'string'},
+                            'description': 'Filter by tags (optional)'
+                        },
+                        'limit': {
+                            'type': 'number',
+                            'description': 'Maximum number of results (default: 10)',
+                            'default': 10
+                        }
+                    },
+                    'required': ['query']
+                }
+            },
+            {
+                'name': 'get_resource',
+                'description': 'Load full content of a specific resource by name. Use this after search_resources to get detailed instructions.',
+                'inputSchema': {
+                    'type': 'object',
+                    'properties': {
+                        'name': {
+                            'type': 'string',
+                            'description': 'Name of the resource (misspellings resolve to the closest match)'
+                        },
+                        'type': {
+                            'type': 'string',
+                            'enum': RESOURCE_TYPES,
+                            'description': 'Resource type (optional, helps with disambiguation)'
+                        },
+                        'max_tokens': {
+                            'type': 'number',
+                            'description': 'Truncate content at a section boundary to about this many tokens (optional)'
+                        }
+                    },
+                    'required': ['name']
+                }
+            },
+            {
+                'name': 'list_resources',
+                'description': 'List all available resources with metadata (no content). Useful for browsing available resources.',
+                'inputSchema': {
+                    'type': 'object',
+                    'properties': {
+                        'type': {
+                            'type': 'string',
+                            'enum': RESOURCE_TYPES,
+                            'description': 'Filter by resource type (optional)'
+                        }
+                    }
+                }
+            },
+            {
+                'name': 'get_resource_stats',
+                'description': 'Get statistics about indexed resources (counts, last update time) and server request latency.',
+                'inputSchema': {
+                    'type': 'object',
+                    'properties': {}
+                }
+            }
+        ]
+        self.started_at = time.time()
+        # tool name -> {'count', 'totalMs', 'maxMs', 'lastMs'}
+        self.latency: Dict[str, Dict[str, float]] = {}
+
+    def _record_latency(self, tool_name: str, elapsed_ms: float):
+        """Accumulate per-tool request latency"""
+        entry = self.latency.setdefault(tool_name, {'count': 0, 'totalMs': 0.0, 'maxMs': 0.0, 'lastMs': 0.0})
+        entry['count'] += 1
+        entry['totalMs'] += elapsed_ms
+        entry['maxMs'] = max(entry['maxMs'], elapsed_ms)
+        entry['lastMs'] = elapsed_ms
+
+    def latency_report(self) -> Dict[str, Any]:
+        """Per-tool request counts and latency in milliseconds"""
+        return {
+            'uptimeSeconds': round(time.time() - self.started_at, 1),
+            'requests': sum(int(e['count']) for e in self.latency.values()),
+            'tools': {
+                name: {
+                    'count': int(e['count']),
+                    'avgMs': round(e['totalMs'] / e['count'], 3),
+                    'maxMs': round(e['maxMs'], 3),
+                    'lastMs': round(e['lastMs'], 3)
+                }
+                for name, e in self.latency.items()
+            }
+        }
+
+    def handle_tool_call(self, tool_name: str, args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Handle tool calls"""
+        args = args or {}
+        start = time.perf_counter()
+
+        try:
+            if tool_name == 'search_resources':
+                results = search_resources(
+                    args['query'],
+                    resource_type=args.get('type'),
+                    tags=args.get('tags') or None,
+                    limit=int(args.get('limit', 10))
+                )
+                result = {
+                    'success': True,
+                    'results': [
+                        {
+                            'name': r['name'],
+                            'type': r['type'],
+                            'description': r.get('description', ''),
+                            'path': r['path'],
+                            'size': _format_size(r['size']),
+                            **_optional_fields(r, 'tags', 'tools', 'tokens')
+                        }
+                        for r in results
+                    ],
+                    'count': len(results),
+                    'message': f'Found {len(results)} resource(s). Use get_resource to load full content.'
+                    if results else 'No resources found matching your query.'
+                }
+
+            elif tool_name == 'get_resource':
+                max_tokens = args.get('max_tokens')
+                resource = get_resource_by_name(
+                    args['name'], args.get('type'), int(max_tokens) if max_tokens is not None else None
+                )
+                result = {
+                    'success': True,
+                    'resource': {
+                        'name': resource['name'],
+                        'type': resource['type'],
+                        'description': resource.get('description', ''),
+                        'path': resource['path'],
+                        'size': _format_size(resource['size']),
+                        'content': resource['content'],
+                        **_optional_fields(resource, 'tags', 'tools', 'similarity', 'truncated')
+                    }
+                }
+
+            elif tool_name == 'list_resources':
+                resources = list_resources(args.get('type'))
+                result = {
+                    'success': True,
+                    'resources': [
+                        {
+                            'name': r['name'],
+                            'type': r['type'],
+                            'description': r.get('description', ''),
+                            'size': _format_size(r['size']),
+                            **_optional_fields(r, 'tags')
+                        }
+                        for r in resources
+                    ],
+                    'count': len(resources)
+                }
+
+            elif tool_name == 'get_resource_stats':
+                result = {
+                    'success': True,
+                    'stats': get_stats(),
+                    'server': self.latency_report()
+                }
+
+            else:
+                return {'success': False, 'error': f'Unknown tool: {tool_name}'}
+
+        except KeyError as e:
+            result = {'success': False, 'error': f'Missing argument: {e.args[0]}'}
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+
+        self._record_latency(tool_name, (time.perf_counter() - start) * 1000)
+        return result
+
+    def handle_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Dispatch one JSON-RPC message; returns the response (None for notifications)"""
+        method = message.get('method')
+        message_id = message.get('id')
+
+        if method == 'initialize':
+            result = {
+                'protocolVersion': PROTOCOL_VERSION,
+                'capabilities': {'tools': {}},
+                'serverInfo': {'name': SERVER_NAME, 'version': SERVER_VERSION}
+            }
+        elif method == 'tools/list':
+            result = {'tools': self.tools}
+        elif method == 'tools/call':
+            params = message.get('params') or {}
+            tool_result = self.handle_tool_call(params.get('name'), params.get('arguments'))
+            result = {
+                'content': [{'type': 'text', 'text': json.dumps(tool_result)}],
+                'isError': not tool_result.get('success', False)
+            }
+        elif method == 'ping':
+            result = {}
+        elif message_id is None:
+            # Notifications (e.g. notifications/initialized) get no response
+            return None
+        else:
+            return {
+                'jsonrpc': '2.0',
+                'id': message_id,
+                'error': {'code': -32601, 'message': f'Method not found: {method}'}
+            }
+
+        if message_id is None:
+            return None
+        return {'jsonrpc': '2.0', 'id': message_id, 'result': result}
+
+    def start(self):
+        """Start MCP server with stdio transport"""
+        try:
+            warm_cache()
+        except FileNotFoundError as e:
+            print(f'Warning: {e}', file=sys.stderr)
+
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                message = json.loads(line)
+            except ValueError as e:
+                self.send_message({
+                    'jsonrpc': '2.0',
+                    'id': None,
+                    'error': {'code': -32700, 'message': f'Parse error: {e}'}
+                })
+                continue
+
+            message_id = None
+            try:
+                message_id = message.get('id')
+                response = self.handle_message(message)
+            except Exception as e:
+                response = {
+                    'jsonrpc': '2.0',
+                    'id': message_id,
+                    'error': {'code': -32603, 'message': str(e)}
+                }
+
+            if response is not None:
+                self.send_message(response)
+
+    def send_message(self, message: Dict[str, Any]):
+        """Send message to stdout"""
+        sys.stdout.write(json.dumps(message) + '\n')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    MCPResourceServer().start()
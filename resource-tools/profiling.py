@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Profiling
+Opt-in timing breakdown for index_builder.py and resource_loader.py --profile.
+Code marks phases with `with phase('rank'):` and counts bytes with
+add_bytes(n); both are no-ops unless a profile is active. The report is JSON
+(milliseconds per phase, call counts, bytes read), optionally alongside a
+cProfile dump
+"""
+
+import cProfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class Profile:
+    """Accumulated time per phase and bytes read; safe to update from worker threads"""
+
+    def __init__(self, dump_path: Optional[Path] = None):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.bytes_read = 0
+        self.dump_path = dump_path
+        self._lock = threading.Lock()
+        self._profiler = cProfile.Profile() if dump_path else None
+
+    def record(self, name: str, elapsed: float):
+        with self._lock:
+            entry = self.phases.setdefault(name, {'ms': 0.0, 'calls': 0})
+            entry['ms'] += elapsed * 1000
+            entry['calls'] += 1
+
+    def add_bytes(self, count: int):
+        with self._lock:
+            self.bytes_read += count
+
+    def report(self) -> Dict[str, Any]:
+        """Phases in first-seen order with total time, calls and bytes read"""
+        return {
+            'totalMs': round((time.perf_counter() - self.started) * 1000, 3),
+            'phases': {
+                name: {'ms': round(entry['ms'], 3), 'calls': int(entry['calls'])}
+                for name, entry in self.phases.items()
+            },
+            'bytesRead': self.bytes_read,
+            **({'cprofile': str(self.dump_path)} if self.dump_path else {})
+        }
+
+
+# The active profile, if any (one per process)
+_active: Optional[Profile] = None
+
+
+def start(dump_path: Optional[Path] = None) -> Profile:
+    """Activate profiling (and cProfile when dump_path is given)"""
+    global _active
+    _active = Profile(dump_path)
+    if _active._profiler:
+        _active._profiler.enable()
+    return _active
+
+
+def stop() -> Optional[Dict[str, Any]]:
+    """Deactivate profiling, write the cProfile dump and return the report"""
+    global _active
+    profile, _active = _active, None
+    if profile is None:
+        return None
+    if profile._profiler:
+        profile._profiler.disable()
+        profile._profiler.dump_stats(str(profile.dump_path))
+    return profile.report()
+
+
+@contextmanager
+def _timed(profile: Profile, name: str):
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.record(name, time.perf_counter() - start_time)
+
+
+def phase(name: str):
+    """Context manager timing one phase (a shared no-op when profiling is off)"""
+    return _timed(_active, name) if _active else nullcontext()
+
+
+def record(name: str, elapsed: float):
+    """Add a phase duration measured elsewhere (seconds)"""
+    if _active:
+        _active.record(name, elapsed)
+
+
+def add_bytes(count: int):
+    """Count bytes read from disk"""
+    if _active:
+        _active.add_bytes(count)
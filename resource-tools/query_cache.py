@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+"""
+Query Cache
+Search results cached in memory (LRU) and optionally in a small SQLite file
+shared by every process, keyed by the search arguments and the index's
+generatedAt. A rebuilt index has a new generatedAt, so old entries simply stop
+matching and are deleted the next time the cache is used. The file is never
+deleted by index_builder: long-lived readers (the MCP server) keep it open
+"""
+
+import json
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    generated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+)
+'''
+
+
+def make_key(query: str, resource_type: Optional[str], tags: Optional[List[str]], limit: int) -> str:
+    """Cache key for one search (tag order does not matter)"""
+    return json.dumps([query, resource_type, sorted(tags) if tags else None, limit])
+
+
+class QueryCache:
+    """Result lists by key, valid for one generatedAt"""
+
+    def __init__(self, max_entries: int, db_path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries: 'OrderedDict[str, Any]' = OrderedDict()
+        self._generated_at: Optional[str] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Connection to the on-disk cache, or None if disabled or unavailable"""
+        if self.db_path is None:
+            return None
+        if self._conn is None:
+            try:
+                self._conn = sqlite3.connect(str(self.db_path), timeout=1.0, check_same_thread=False)
+                self._conn.execute('PRAGMA journal_mode=WAL')
+                self._conn.execute(SCHEMA)
+            except sqlite3.Error:
+                self.db_path = None
+                return None
+        return self._conn
+
+    def _switch(self, generated_at: str):
+        """Forget entries from an older index build"""
+        if generated_at == self._generated_at:
+            return
+        self._entries.clear()
+        self._generated_at = generated_at
+        conn = self._db()
+        if conn:
+            try:
+                with conn:
+                    conn.execute('DELETE FROM results WHERE generated_at != ?', (generated_at,))
+            except sqlite3.Error:
+                pass
+
+    def get(self, key: str, generated_at: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached results for key under this index build, else None"""
+        self._switch(generated_at)
+        results = self._entries.get(key)
+        if results is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return results
+
+        conn = self._db()
+        if conn:
+            try:
+                row = conn.execute(
+                    'SELECT data FROM results WHERE key = ? AND generated_at = ?', (key, generated_at)
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row:
+                results = json.loads(row[0])
+                self._remember(key, results)
+                self.disk_hits += 1
+                return results
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, generated_at: str, results: List[Dict[str, Any]]):
+        """Store results for key under this index build"""
+        self._switch(generated_at)
+        self._remember(key, results)
+        conn = self._db()
+        if conn:
+            try:
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO results (key, generated_at, data) VALUES (?, ?, ?)',
+                        (key, generated_at, json.dumps(results))
+                    )
+            except sqlite3.Error:
+                pass
+
+    def _remember(self, key: str, results: List[Dict[str, Any]]):
+        self._entries[key] = results
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop in-memory entries, reset counters and close the database"""
+        self._entries.clear()
+        self._generated_at = None
+        self.memory_hits = self.disk_hits = self.misses = 0
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and hit/miss counters"""
+        return {
+            'entries': len(self._entries),
+            'memoryHits': self.memory_hits,
+            'diskHits': self.disk_hits,
+            'misses': self.misses,
+            'disk': self.db_path is not None
+        }
@@ -6,23 +6,289 @@ Provides functions to search and load resources efficiently
 Designed for use as a tool by AI models to minimize token usage
 """
 
+import heapq
 import json
+import os
+import sqlite3
 import sys
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union
 
-WORKSPACE_DIR = Path(__file__).parent.parent  # E:\_Development
-INDEX_DIR = Path(__file__).parent / 'indexes'
+import apply_to
+import profiling
+import query_cache
+import sqlite_backend
+import vector_index
+from content_cache import ContentCache
+from profiling import phase
+from search_index import SEARCH_INDEX_VERSION, rank, similar_names, tokenize
+from sections import BYTES_PER_TOKEN, estimate_tokens, extract_outline, find_section
+
+# Both can be overridden (e.g. to query a synthetic corpus in benchmark.py)
+WORKSPACE_DIR = Path(os.environ.get('RESOURCE_TOOLS_WORKSPACE', Path(__file__).parent.parent))  # E:\_Development
+INDEX_DIR = Path(os.environ.get('RESOURCE_TOOLS_INDEX_DIR', Path(__file__).parent / 'indexes'))
+SQLITE_PATH = INDEX_DIR / 'resources.db'
+VECTORS_PATH = INDEX_DIR / 'vectors.npz'
+
+# 'json' (default) or 'sqlite' (requires index_builder.py --sqlite)
+BACKEND = os.environ.get('RESOURCE_TOOLS_BACKEND', 'json')
+
+# Upper bound on resource file content kept in memory (bytes on disk)
+CONTENT_CACHE_BYTES = int(os.environ.get('RESOURCE_TOOLS_CONTENT_CACHE_BYTES', 32 * 1024 * 1024))
+
+# Search result cache: 'disk' (memory plus indexes/query-cache.db shared by all
+# processes, the default), 'memory' or 'off'
+QUERY_CACHE = os.environ.get('RESOURCE_TOOLS_QUERY_CACHE', 'disk')
+QUERY_CACHE_PATH = INDEX_DIR / 'query-cache.db'
+QUERY_CACHE_ENTRIES = 512
+
+# Must match index_builder.HEADER_VERSION
+HEADER_VERSION = 2
+
+# Added to the BM25 score when the whole query equals the resource name
+EXACT_NAME_BOOST = 100.0
+
+# Trigram similarity a misspelled name needs to resolve to a resource on its own,
+# and the lower bar for listing it under "Did you mean"
+FUZZY_MATCH_THRESHOLD = 0.6
+SUGGESTION_THRESHOLD = 0.3
+SUGGESTION_LIMIT = 5
+
+# With max_tokens, leftover budget below this is not spent on a truncated resource
+MIN_TRUNCATED_TOKENS = 100
+
+# Files or folders marking a project root; applyTo globs are relative to it.
+# The nearest folder holding .git wins, then the nearest holding any of these
+PROJECT_ROOT_MARKERS = ('.github', 'pyproject.toml', 'package.json', 'setup.py')
+
+
+# Map resource type -> section of the master index
+TYPE_MAP = {
+    'claude-skill': 'skills',
+    'copilot-agent': 'agents',
+    'copilot-prompt': 'prompts',
+    'copilot-instruction': 'instructions'
+}
+
+# Parsed index files: index_type -> (mtime_ns, size, data)
+_index_cache: Dict[str, Tuple[int, int, Any]] = {}
+
+# Lookup tables per scope ('' = all resources, else one resource type),
+# rebuilt when generatedAt changes
+_lookup_cache: Dict[str, Dict[str, Any]] = {}
+
+# Resource content, least recently used evicted first
+_content_cache = ContentCache(CONTENT_CACHE_BYTES)
+
+# Search results by (query, type, tags, limit), valid for one generatedAt
+_query_cache = None if QUERY_CACHE == 'off' else query_cache.QueryCache(
+    QUERY_CACHE_ENTRIES, QUERY_CACHE_PATH if QUERY_CACHE == 'disk' else None
+)
+
+# Compiled applyTo matcher (see apply_to.compile_index), rebuilt when generatedAt changes
+_apply_to_cache: Optional[Dict[str, Any]] = None
+
+# Loaded vectors.npz: (mtime_ns, size, arrays)
+_vector_cache: Optional[Tuple[int, int, Dict[str, Any]]] = None
+
+# Open SQLite connection: (mtime_ns of resources.db, connection, its generatedAt)
+_sqlite_conn: Optional[Tuple[int, sqlite3.Connection, Optional[str]]] = None
 
 
 def load_index(index_type: str = 'master') -> Dict[str, Any]:
-    """Load index files"""
+    """
+    Load index files.
+    Parsed indexes stay cached in the process and are only re-read when the
+    file's mtime or size changes. The returned object is shared: do not mutate it.
+    index_builder replaces index files by rename, so the file is stat'ed through
+    the open handle: the cache key always describes the bytes that were read.
+    """
     index_path = INDEX_DIR / f'{index_type}-index.json'
-    if not index_path.exists():
+    try:
+        f = open(index_path, 'rb')
+    except FileNotFoundError:
         raise FileNotFoundError(f'Index not found: {index_type}. Run index_builder.py first.')
 
-    with open(index_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with f:
+        stat = os.fstat(f.fileno())
+        cached = _index_cache.get(index_type)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        with phase('indexRead'):
+            raw = f.read()
+    profiling.add_bytes(len(raw))
+    with phase('indexParse'):
+        data = json.loads(raw)
+
+    _index_cache[index_type] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
+def clear_cache():
+    """Drop all cached indexes, lookup tables, content and the SQLite connection"""
+    global _sqlite_conn, _vector_cache, _apply_to_cache
+    _vector_cache = None
+    _apply_to_cache = None
+    _index_cache.clear()
+    _lookup_cache.clear()
+    _content_cache.clear()
+    if _query_cache:
+        _query_cache.clear()
+    if _sqlite_conn:
+        _sqlite_conn[1].close()
+        _sqlite_conn = None
+
+
+def _sqlite() -> Optional[sqlite3.Connection]:
+    """
+    Connection to resources.db when the SQLite backend is selected, else None.
+    Reopened when the database file is replaced by a rebuild. Builds without
+    --sqlite leave the database behind, so it is refused once its generatedAt
+    no longer matches the JSON index.
+    """
+    global _sqlite_conn
+    if BACKEND != 'sqlite':
+        return None
+
+    try:
+        mtime_ns = SQLITE_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError('SQLite index not found. Run index_builder.py --sqlite first.')
+
+    if not _sqlite_conn or _sqlite_conn[0] != mtime_ns:
+        if _sqlite_conn:
+            _sqlite_conn[1].close()
+        conn = sqlite_backend.connect(SQLITE_PATH)
+        _sqlite_conn = (mtime_ns, conn, sqlite_backend.get_meta(conn, 'generatedAt'))
+
+    _check_generated_at(_sqlite_conn[2], 'SQLite index', '--sqlite')
+    return _sqlite_conn[1]
+
+
+def _json_generated_at() -> Optional[str]:
+    """generatedAt of the JSON index (header, else master), or None if there is none"""
+    try:
+        header = _load_header()
+        return (header or load_index('master'))['generatedAt']
+    except FileNotFoundError:
+        return None
+
+
+def _check_generated_at(generated_at: Optional[str], label: str, flag: str):
+    """Raise when an optional index was written by an older build than the JSON index"""
+    current = _json_generated_at()
+    if current is not None and generated_at != current:
+        raise FileNotFoundError(
+            f'{label} is outdated (built {generated_at}, index built {current}). '
+            f'Run index_builder.py {flag} again.'
+        )
+
+
+def warm_cache():
+    """Load the master and search indexes up front (used by long-running servers)"""
+    if _sqlite():
+        return
+    _lookups()
+    for index_type in ('search', 'names'):
+        try:
+            load_index(index_type)
+        except FileNotFoundError:
+            pass
+
+
+def _build_tables(resources: List[Dict[str, Any]], generated_at: str) -> Dict[str, Any]:
+    """Lookup tables: resources in index order, type -> list, path -> resource, name -> resources"""
+    with phase('tables'):
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        by_name: Dict[str, List[Dict[str, Any]]] = {}
+        by_name_lower: Dict[str, List[Dict[str, Any]]] = {}
+        for r in resources:
+            by_type.setdefault(r['type'], []).append(r)
+            # Names of collapsed duplicates (index_builder.py --dedupe) resolve to the canonical entry
+            for name in dict.fromkeys([r['name'], *(alias['name'] for alias in r.get('aliases', []))]):
+                by_name.setdefault(name, []).append(r)
+                by_name_lower.setdefault(name.lower(), []).append(r)
+
+        return {
+            'generatedAt': generated_at,
+            'all': resources,
+            'by_type': by_type,
+            'by_path': {r['path']: r for r in resources},
+            'by_name': by_name,
+            'by_name_lower': by_name_lower,
+        }
+
+
+def _load_header() -> Optional[Dict[str, Any]]:
+    """
+    Compact header (stats and shard offsets), or None for indexes built without
+    one or when master-index.json is not the file it was written for (rewritten
+    by index-builder.js, or a build that stopped before the header): callers
+    then read the master itself.
+    """
+    try:
+        header = load_index('header')
+        master_stat = os.stat(INDEX_DIR / 'master-index.json')
+    except FileNotFoundError:
+        return None
+    if header.get('version') != HEADER_VERSION or not _describes_master(header, master_stat):
+        return None
+    return header
+
+
+def _describes_master(header: Dict[str, Any], stat: os.stat_result) -> bool:
+    """True if the header was written for the master index with this stat"""
+    master = header.get('master') or {}
+    return master.get('size') == stat.st_size and master.get('mtimeNs') == stat.st_mtime_ns
+
+
+def _load_shard(header: Dict[str, Any], section: str) -> List[Dict[str, Any]]:
+    """
+    Read one type's resource array by seeking to its byte range in master-index.json.
+    Raises ValueError if the open file is not the master the header describes.
+    """
+    shard = header['shards'][section]
+    with phase('indexRead'), open(INDEX_DIR / 'master-index.json', 'rb') as f:
+        if not _describes_master(header, os.fstat(f.fileno())):
+            raise ValueError('master-index.json changed since header-index.json was written')
+        f.seek(shard['offset'])
+        raw = f.read(shard['length'])
+    profiling.add_bytes(len(raw))
+    with phase('indexParse'):
+        return json.loads(raw)
+
+
+def _lookups(resource_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Lookup tables over all resources, or over one type's shard only.
+    Typed lookups read just that shard (located via the header) instead of
+    parsing the whole master index. Tables are rebuilt when generatedAt changes.
+    """
+    scope = resource_type or ''
+    header = _load_header() if resource_type else None
+
+    if header and resource_type in TYPE_MAP:
+        generated_at = header['generatedAt']
+        cached = _lookup_cache.get(scope)
+        if cached and cached['generatedAt'] == generated_at:
+            return cached
+        try:
+            resources = _load_shard(header, TYPE_MAP[resource_type])
+        except (OSError, ValueError, KeyError):
+            # Master index rewritten since the header was read: use the full index
+            resources = None
+        if resources is not None:
+            _lookup_cache[scope] = _build_tables(resources, generated_at)
+            return _lookup_cache[scope]
+
+    master_index = load_index('master')
+    cached = _lookup_cache.get('')
+    if not cached or cached['generatedAt'] != master_index['generatedAt']:
+        sections = master_index['resources']
+        all_resources = [r for section in TYPE_MAP.values() for r in sections.get(section, [])]
+        cached = _lookup_cache[''] = _build_tables(all_resources, master_index['generatedAt'])
+    return cached
 
 
 def search_resources(
@@ -30,32 +296,335 @@ def search_resources(
     resource_type: Optional[str] = None,
     tags: Optional[List[str]] = None,
     limit: int = 10,
-    include_content: bool = False
+    include_content: bool = False,
+    max_tokens: Optional[int] = None,
+    mode: str = 'keyword'
 ) -> List[Dict[str, Any]]:
-    """Search resources by query"""
-    master_index = load_index('master')
-    all_resources = (
-        master_index['resources']['skills'] +
-        master_index['resources']['agents'] +
-        master_index['resources']['prompts'] +
-        master_index['resources']['instructions']
-    )
-
-    # Filter by type if specified
-    if resource_type:
-        all_resources = [r for r in all_resources if r['type'] == resource_type]
+    """
+    Search resources by query.
+    mode='vector' ranks by TF-IDF cosine similarity over body text instead of
+    keyword matching (needs index_builder.py --vectors and NumPy).
+    max_tokens loads content (implies include_content) for the best-ranked
+    results that fit the budget; see _attach_content.
+    """
+    if mode == 'vector':
+        results = vector_search(query, resource_type, tags, limit)
+        _attach_content(results, include_content, max_tokens)
+        return results
+    if mode != 'keyword':
+        raise ValueError(f'Unknown search mode: {mode}. Use keyword or vector')
+    return _search(query, resource_type, tags, limit, include_content, max_tokens=max_tokens)
+
+
+def _load_vectors() -> Dict[str, Any]:
+    """vectors.npz, cached until the file changes; refused if older than the JSON index"""
+    global _vector_cache
+    vector_index.require_numpy()
+    try:
+        stat = VECTORS_PATH.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError('Vector index not found. Run index_builder.py --vectors first.')
+
+    if not _vector_cache or _vector_cache[0] != stat.st_mtime_ns or _vector_cache[1] != stat.st_size:
+        data = vector_index.load_vector_index(VECTORS_PATH)
+        if data is None:
+            raise FileNotFoundError('Vector index is outdated. Run index_builder.py --vectors again.')
+        _vector_cache = (stat.st_mtime_ns, stat.st_size, data)
+
+    _check_generated_at(_vector_cache[2]['generatedAt'], 'Vector index', '--vectors')
+    return _vector_cache[2]
+
+
+def vector_search(
+    query: str,
+    resource_type: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Resources most similar to query by TF-IDF cosine similarity (name,
+    description and body). Results are copies with a 'score' in [0, 1].
+    """
+    vectors = _load_vectors()
+    # Filters are applied after top-k, so look further down when filtering
+    k = limit if not (resource_type or tags) else limit * 10
+
+    while True:
+        ranked = vector_index.top_k(vectors, query, k)
+        results = []
+        for path, score in ranked:
+            resource = _resource_by_path(path, resource_type)
+            if resource is None or (tags and not any(tag in resource.get('tags', []) for tag in tags)):
+                continue
+            results.append({**resource, 'score': round(score, 4)})
+            if len(results) == limit:
+                return results
+        if len(ranked) < k:
+            return results
+        k *= 4
+
+
+def search_many(
+    queries: List[Union[str, Dict[str, Any]]],
+    resource_type: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    limit: int = 10,
+    include_content: bool = False,
+    max_tokens: Optional[int] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run several searches with one index load and one tokenization pass.
+    Each query is a string, or a dict with 'query' and optional 'type', 'tags',
+    'limit', 'include_content' and 'max_tokens' overriding the shared defaults.
+    Returns one result list per query, in order.
+    """
+    specs = [{'query': q} if isinstance(q, str) else q for q in queries]
+    terms = {query: tokenize(query) for query in {spec['query'] for spec in specs}}
+    postings_cache = _new_postings_cache()
+
+    return [
+        _search(
+            spec['query'],
+            spec.get('type', resource_type),
+            spec.get('tags', tags),
+            spec.get('limit', limit),
+            spec.get('include_content', include_content),
+            terms[spec['query']],
+            postings_cache,
+            spec.get('max_tokens', max_tokens)
+        )
+        for spec in specs
+    ]
+
+
+def _new_postings_cache() -> Dict[str, Any]:
+    """Term -> postings memo shared across queries, tied to one search index build"""
+    return {'generatedAt': None, 'terms': {}}
+
+
+def _search(
+    query: str,
+    resource_type: Optional[str],
+    tags: Optional[List[str]],
+    limit: int,
+    include_content: bool,
+    terms: Optional[List[str]] = None,
+    postings_cache: Optional[Dict[str, Any]] = None,
+    max_tokens: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    search_resources with optional pre-tokenized terms and shared postings cache.
+    Ranked results (without content) are served from the query cache when the
+    same search already ran against this index build.
+    """
+    if _query_cache is None:
+        results = _ranked_results(query, resource_type, tags, limit, terms, postings_cache)
+    else:
+        key = f'{BACKEND}:{query_cache.make_key(query, resource_type, tags, limit)}'
+        generated_at = _index_generated_at()
+        with phase('queryCache'):
+            cached = _query_cache.get(key, generated_at)
+        if cached is None:
+            results = _ranked_results(query, resource_type, tags, limit, terms, postings_cache)
+            _query_cache.put(key, generated_at, [dict(r) for r in results])
+        else:
+            results = [dict(r) for r in cached]
+
+    # Load full content if requested
+    _attach_content(results, include_content, max_tokens)
+
+    return results
+
+
+def _index_generated_at() -> str:
+    """generatedAt of the current index, read from the smallest file that has it"""
+    conn = _sqlite()
+    if conn:
+        return sqlite_backend.get_meta(conn, 'generatedAt') or ''
+    header = _load_header()
+    return (header or load_index('master'))['generatedAt']
+
+
+def _ranked_results(
+    query: str,
+    resource_type: Optional[str],
+    tags: Optional[List[str]],
+    limit: int,
+    terms: Optional[List[str]] = None,
+    postings_cache: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Ranked search results (copies with 'score', no content) from the active backend"""
+    conn = _sqlite()
+    if conn:
+        with phase('rank'):
+            return sqlite_backend.search(conn, query, resource_type, tags, limit)
+
+    tables = _lookups(resource_type)
+
+    all_resources = tables['by_type'].get(resource_type, []) if resource_type else tables['all']
 
     # Filter by tags if specified
     if tags:
-        all_resources = [
-            r for r in all_resources
-            if 'tags' in r and any(tag in r['tags'] for tag in tags)
-        ]
+        with phase('filter'):
+            all_resources = [
+                r for r in all_resources
+                if 'tags' in r and any(tag in r['tags'] for tag in tags)
+            ]
+
+    with phase('rank'):
+        return _rank_filtered(query, tables, all_resources, limit, terms, postings_cache)
 
-    # Search in name and description
+
+def _rank_filtered(
+    query: str,
+    tables: Dict[str, Any],
+    all_resources: List[Dict[str, Any]],
+    limit: int,
+    terms: Optional[List[str]],
+    postings_cache: Optional[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    BM25 ranking restricted to all_resources, topped up with substring
+    matches (without 'score') when it finds fewer than `limit`.
+    Only the best `limit` matches are selected (more when type/tag filters
+    may discard some) and copied, so cost does not grow with the match count.
+    """
     query_lower = query.lower()
+    # Only filter when the tables hold more than the requested type/tags
+    allowed = None if all_resources is tables['all'] else {id(r) for r in all_resources}
+    boost = {r['path']: EXACT_NAME_BOOST for r in tables['by_name_lower'].get(query_lower, [])}
+
+    k = limit if allowed is None else limit * 4
+    matches = []
+    while True:
+        ranked = _ranked_search(query, tables['generatedAt'], terms, postings_cache, k, boost)
+        if ranked is None:
+            break
+
+        matches = []
+        for path, score in ranked:
+            resource = tables['by_path'].get(path)
+            if resource is None or (allowed is not None and id(resource) not in allowed):
+                continue
+            matches.append((resource, score))
+            if len(matches) == limit:
+                break
+        # Filters left too few: look further down the ranking
+        if len(matches) == limit or len(ranked) < k:
+            break
+        k *= 4
+
+    results = [{**resource, 'score': round(score, 4)} for resource, score in matches]
+    results.sort(key=lambda r: (-r['score'], r['name'], r['path']))
+
+    # Tokens only match whole words and prefixes; infixes ('script' in
+    # 'javascript') are left to the substring scan
+    if len(results) < limit:
+        seen = {r['path'] for r in results}
+        extra = [r for r in _substring_search(all_resources, query_lower, limit) if r['path'] not in seen]
+        results += [dict(r) for r in extra[:limit - len(results)]]
+    return results
+
+
+def _resource_tokens(resource: Dict[str, Any]) -> int:
+    """Estimated tokens of a resource's content (indexes built before token counts use its size)"""
+    return resource.get('tokens') or estimate_tokens(resource['size'])
+
+
+def _truncate_to_tokens(content: str, max_tokens: int) -> str:
+    """
+    Leading part of content within max_tokens, cut at the last section heading
+    that fits (or the last line break if no heading does)
+    """
+    budget = max_tokens * BYTES_PER_TOKEN
+    raw = content.encode('utf-8')
+    if len(raw) <= budget:
+        return content
+
+    cut = max((s['offset'] for s in extract_outline(raw) if 0 < s['offset'] <= budget), default=0)
+    if not cut:
+        cut = raw.rfind(b'\n', 0, budget) + 1 or budget
+    return raw[:cut].decode('utf-8', errors='ignore')
+
+
+def _attach_content(results: List[Dict[str, Any]], include_content: bool, max_tokens: Optional[int]):
+    """
+    Add 'content' to results. Without max_tokens every result gets its full content.
+    With max_tokens, results are taken in rank order and loaded whole while they
+    fit the budget; ones that do not fit are skipped ('contentSkipped') so smaller
+    lower-ranked results can still use the budget. What is left then goes to the
+    best-ranked skipped result, truncated at a section boundary ('truncated').
+    """
+    if max_tokens is None:
+        if include_content:
+            for r in results:
+                r['content'] = load_resource_content(r['path'])
+        return
+
+    remaining = max_tokens
+    skipped = []
+    for r in results:
+        tokens = _resource_tokens(r)
+        if tokens <= remaining:
+            r['content'] = load_resource_content(r['path'])
+            remaining -= tokens
+        else:
+            skipped.append(r)
+
+    if skipped and remaining >= MIN_TRUNCATED_TOKENS:
+        r = skipped.pop(0)
+        r['content'] = _truncate_to_tokens(load_resource_content(r['path']), remaining)
+        r['truncated'] = True
+
+    for r in skipped:
+        r['contentSkipped'] = True
+
+
+def _ranked_search(
+    query: str,
+    generated_at: str,
+    terms: Optional[List[str]] = None,
+    postings_cache: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None,
+    boost: Optional[Dict[str, float]] = None
+) -> Optional[List[Any]]:
+    """
+    BM25 ranking via the inverted index (the best `limit` when given).
+    Returns None when the search index is missing, stale, or the query has no
+    indexable tokens, so the caller can fall back to substring matching.
+    """
+    if terms is None:
+        terms = tokenize(query)
+    if not terms:
+        return None
+
+    try:
+        search_index = load_index('search')
+    except FileNotFoundError:
+        return None
+
+    if search_index.get('version') != SEARCH_INDEX_VERSION or \
+       search_index.get('generatedAt') != generated_at:
+        return None
+
+    term_cache = None
+    if postings_cache is not None:
+        if postings_cache['generatedAt'] != generated_at:
+            postings_cache['generatedAt'] = generated_at
+            postings_cache['terms'] = {}
+        term_cache = postings_cache['terms']
+
+    return rank(search_index, query, terms, term_cache, limit, boost)
+
+
+def _substring_search(
+    resources: List[Dict[str, Any]],
+    query_lower: str,
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Case-insensitive substring match on name and description (the best `limit` when given)"""
     results = [
-        r for r in all_resources
+        r for r in resources
         if query_lower in r['name'].lower() or
            (r.get('description') and query_lower in r['description'].lower())
     ]
@@ -66,96 +635,435 @@ def search_resources(
         name_match = 1 if query_lower in r['name'].lower() else 0
         return (-name_exact, -name_match, r['name'])
 
+    if limit is not None:
+        return heapq.nsmallest(limit, results, key=sort_key)
     results.sort(key=sort_key)
-
-    # Limit results
-    results = results[:limit]
-
-    # Load full content if requested
-    if include_content:
-        for r in results:
-            r['content'] = load_resource_content(r['path'])
-
     return results
 
 
 def load_resource_content(resource_path: str) -> str:
     """Load full content of a resource by path (all paths relative to workspace)."""
     full_path = WORKSPACE_DIR / resource_path
-    if not full_path.exists():
+    try:
+        stat = full_path.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(f'Resource not found: {resource_path}')
 
-    return full_path.read_text(encoding='utf-8')
+    cached = _content_cache.get(resource_path, stat.st_mtime_ns)
+    if cached is not None:
+        return cached
 
+    with phase('contentRead'):
+        content = full_path.read_text(encoding='utf-8')
+    profiling.add_bytes(stat.st_size)
+    _content_cache.put(resource_path, stat.st_mtime_ns, stat.st_size, content)
+    return content
 
-def get_resource_by_name(name: str, resource_type: Optional[str] = None) -> Dict[str, Any]:
-    """Get resource by exact name"""
-    master_index = load_index('master')
-    all_resources = (
-        master_index['resources']['skills'] +
-        master_index['resources']['agents'] +
-        master_index['resources']['prompts'] +
-        master_index['resources']['instructions']
-    )
 
-    if resource_type:
-        all_resources = [r for r in all_resources if r['type'] == resource_type]
+def _resource_by_path(resource_path: str, resource_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Resource metadata by workspace-relative path (None if not indexed or of another type)"""
+    conn = _sqlite()
+    if conn:
+        resource = sqlite_backend.get_by_path(conn, resource_path)
+    else:
+        resource = _lookups(resource_type)['by_path'].get(resource_path)
+    if resource and resource_type and resource['type'] != resource_type:
+        return None
+    return resource
+
+
+def find_similar_names(
+    name: str,
+    resource_type: Optional[str] = None,
+    limit: int = SUGGESTION_LIMIT
+) -> List[Dict[str, Any]]:
+    """
+    Resources whose name or file name is closest to name, by trigram similarity
+    (1.0 = same name ignoring case, punctuation and .agent/.prompt suffixes).
+    Returns [{name, type, path, similarity}, ...] best first; empty when
+    names-index.json is missing.
+    """
+    try:
+        name_index = load_index('names')
+    except FileNotFoundError:
+        return []
+    if name_index.get('version') != SEARCH_INDEX_VERSION:
+        return []
+
+    # Typed lookups discard other types' keys, so look further down the list
+    candidates = similar_names(name_index, name, limit * 4 if resource_type else limit)
+
+    matches = []
+    seen = set()
+    for key_id, similarity in candidates:
+        for resource_path in name_index['paths'][key_id]:
+            if resource_path in seen:
+                continue
+            seen.add(resource_path)
+            resource = _resource_by_path(resource_path, resource_type)
+            if resource:
+                matches.append({
+                    'name': resource['name'],
+                    'type': resource['type'],
+                    'path': resource['path'],
+                    'similarity': similarity
+                })
+    return matches[:limit]
+
+
+def _find_fuzzy(name: str, resource_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Resolve a name that has no exact match via the trigram index.
+    A clear best match above FUZZY_MATCH_THRESHOLD is returned (with its
+    similarity); otherwise the error lists the closest names.
+    """
+    matches = find_similar_names(name, resource_type)
+    if matches:
+        best = matches[0]
+        # Copies of one resource share a name; a tie between different names is ambiguous
+        unambiguous = best['similarity'] == 1.0 or not any(
+            m['similarity'] == best['similarity'] and m['name'] != best['name'] for m in matches[1:]
+        )
+        if best['similarity'] >= FUZZY_MATCH_THRESHOLD and unambiguous:
+            resource = _resource_by_path(best['path'], resource_type)
+            return {**resource, 'similarity': best['similarity']}
+
+    suggestions = [m['name'] for m in matches if m['similarity'] >= SUGGESTION_THRESHOLD]
+    if suggestions:
+        raise ValueError(f'Resource not found: {name}. Did you mean: {", ".join(dict.fromkeys(suggestions))}?')
+    raise ValueError(f'Resource not found: {name}')
+
+
+def _find_resource(name: str, resource_type: Optional[str] = None) -> Dict[str, Any]:
+    """Resolve a resource's metadata by exact, then case-insensitive, then fuzzy name"""
+    conn = _sqlite()
+    if conn:
+        resource = sqlite_backend.get_by_name(conn, name, resource_type)
+        return resource or _find_fuzzy(name, resource_type)
+
+    tables = _lookups(resource_type)
+
+    def first_of_type(candidates: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        return next((r for r in candidates if not resource_type or r['type'] == resource_type), None)
 
     # Try exact match first
-    resource = next((r for r in all_resources if r['name'] == name), None)
+    resource = first_of_type(tables['by_name'].get(name, []))
 
     # Try case-insensitive match
     if not resource:
-        resource = next((r for r in all_resources if r['name'].lower() == name.lower()), None)
+        resource = first_of_type(tables['by_name_lower'].get(name.lower(), []))
 
-    if not resource:
-        raise ValueError(f'Resource not found: {name}')
+    return resource or _find_fuzzy(name, resource_type)
 
-    # Load content
-    resource['content'] = load_resource_content(resource['path'])
-    return resource
+
+def get_resource_by_name(
+    name: str,
+    resource_type: Optional[str] = None,
+    max_tokens: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Get resource by name. Misspelled names and file names (e.g. 'sql-optimzation.prompt')
+    resolve to the closest match, which then carries a 'similarity' score.
+    Content over max_tokens is cut at a section boundary and marked 'truncated'.
+    """
+    resource = _find_resource(name, resource_type)
+
+    # Load content (into a copy so the cached index stays metadata-only)
+    content = load_resource_content(resource['path'])
+    if max_tokens is not None and _resource_tokens(resource) > max_tokens:
+        return {**resource, 'content': _truncate_to_tokens(content, max_tokens), 'truncated': True}
+    return {**resource, 'content': content}
+
+
+def _outline_for(resource_path: str) -> List[Dict[str, Any]]:
+    """Heading outline from the sections index, or parsed from the file if not indexed"""
+    try:
+        outline = load_index('sections')['resources'].get(resource_path)
+    except FileNotFoundError:
+        outline = None
+
+    if outline is None:
+        outline = extract_outline((WORKSPACE_DIR / resource_path).read_bytes())
+    return outline
+
+
+def _apply_to_matcher() -> Dict[str, Any]:
+    """Compiled applyTo matcher for the current applyto-index.json"""
+    global _apply_to_cache
+    index = load_index('applyto')
+    if index.get('version') != apply_to.APPLY_TO_INDEX_VERSION:
+        raise FileNotFoundError('ApplyTo index is outdated. Run index_builder.py again.')
+
+    if _apply_to_cache is None or _apply_to_cache['generatedAt'] != index['generatedAt']:
+        _apply_to_cache = apply_to.compile_index(index)
+        _apply_to_cache['resources'] = {}
+    return _apply_to_cache
+
+
+def _project_root(path: Path, roots: Dict[Path, Optional[Path]]) -> Optional[Path]:
+    """
+    Nearest folder above an absolute path holding .git, else the nearest holding
+    a PROJECT_ROOT_MARKERS entry, else None. roots caches the answer per folder.
+    """
+    folder = path.parent
+    if folder in roots:
+        return roots[folder]
+
+    marked = None
+    root = None
+    for candidate in (folder, *folder.parents):
+        if (candidate / '.git').exists():
+            root = candidate
+            break
+        if marked is None and any((candidate / marker).exists() for marker in PROJECT_ROOT_MARKERS):
+            marked = candidate
+    roots[folder] = root or marked
+    return roots[folder]
+
+
+def instructions_for(path: str, root: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Instructions whose applyTo globs match a file path (relative to its project root)"""
+    return instructions_for_many([path], root)[path]
+
+
+def instructions_for_many(paths: List[str], root: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    instructions_for over many paths with one index load: path -> [instruction, ...].
+    Relative paths are matched as given. Absolute paths are made relative to root
+    when given, else to their nearest project root (see _project_root).
+    """
+    matcher = _apply_to_matcher()
+    resolved = matcher['resources']
+    roots: Dict[Path, Optional[Path]] = {}
+    results = {}
+
+    for path in paths:
+        relative = path
+        if Path(path).is_absolute():
+            base = Path(root).resolve() if root else _project_root(Path(path).resolve(), roots)
+            try:
+                relative = Path(path).resolve().relative_to(base).as_posix()
+            except (TypeError, ValueError):
+                pass
+
+        matches = []
+        for i in apply_to.match(matcher, relative):
+            if i not in resolved:
+                resolved[i] = _resource_by_path(matcher['instructions'][i], 'copilot-instruction')
+            if resolved[i]:
+                matches.append(dict(resolved[i]))
+        results[path] = matches
+
+    return results
+
+
+def get_resource_outline(name: str, resource_type: Optional[str] = None) -> Dict[str, Any]:
+    """Heading outline of a resource (heading, level, byte offset and length) without content"""
+    resource = _find_resource(name, resource_type)
+    return {
+        'name': resource['name'],
+        'type': resource['type'],
+        'path': resource['path'],
+        'sections': _outline_for(resource['path'])
+    }
+
+
+def _read_slice(resource_path: str, offset: int, length: int) -> bytes:
+    """Read length bytes at offset from a workspace file"""
+    with phase('contentRead'), open(WORKSPACE_DIR / resource_path, 'rb') as f:
+        f.seek(offset)
+        raw = f.read(length)
+    profiling.add_bytes(len(raw))
+    return raw
+
+
+def load_resource_section(name: str, heading: str, resource_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load one section of a resource (its heading through the next heading of the
+    same or higher level) by seeking to its byte offset instead of reading the file.
+    """
+    resource = _find_resource(name, resource_type)
+    outline = _outline_for(resource['path'])
+
+    section = find_section(outline, heading)
+    if section:
+        raw = _read_slice(resource['path'], section['offset'], section['length'])
+        first_line = raw.split(b'\n', 1)[0].decode('utf-8', errors='replace')
+
+        # File changed since the index was built: fall back to a fresh outline
+        if not first_line.startswith('#') or section['heading'] not in first_line:
+            outline = extract_outline((WORKSPACE_DIR / resource['path']).read_bytes())
+            section = find_section(outline, heading)
+            raw = _read_slice(resource['path'], section['offset'], section['length']) if section else b''
+
+    if not section:
+        available = ', '.join(s['heading'] for s in outline[:20])
+        raise ValueError(f'Section not found: {heading} in {resource["name"]}. Available: {available}')
+
+    return {
+        'name': resource['name'],
+        'type': resource['type'],
+        'path': resource['path'],
+        **section,
+        'content': raw.decode('utf-8')
+    }
 
 
 def list_resources(resource_type: Optional[str] = None) -> List[Dict[str, Any]]:
     """List all available resources (metadata only)"""
-    master_index = load_index('master')
+    if resource_type and resource_type not in TYPE_MAP:
+        raise ValueError(f'Unknown type: {resource_type}')
+
+    conn = _sqlite()
+    if conn:
+        return sqlite_backend.list_by_type(conn, resource_type)
 
+    tables = _lookups(resource_type)
     if resource_type:
-        type_map = {
-            'claude-skill': 'skills',
-            'copilot-agent': 'agents',
-            'copilot-prompt': 'prompts',
-            'copilot-instruction': 'instructions'
-        }
-        if resource_type not in type_map:
-            raise ValueError(f'Unknown type: {resource_type}')
-        return master_index['resources'][type_map[resource_type]]
+        return list(tables['by_type'].get(resource_type, []))
 
-    return (
-        master_index['resources']['skills'] +
-        master_index['resources']['agents'] +
-        master_index['resources']['prompts'] +
-        master_index['resources']['instructions']
-    )
+    return list(tables['all'])
 
 
 def get_stats() -> Dict[str, Any]:
-    """Get statistics about indexed resources"""
-    master_index = load_index('master')
+    """Get statistics about indexed resources and the content and query caches"""
+    conn = _sqlite()
+    if conn:
+        return {
+            **json.loads(sqlite_backend.get_meta(conn, 'stats') or '{}'),
+            'generatedAt': sqlite_backend.get_meta(conn, 'generatedAt'),
+            'contentCache': _content_cache.stats(),
+            'queryCache': _query_cache.stats() if _query_cache else None
+        }
+
+    # The header carries the stats, so the resource arrays are never parsed
+    header = _load_header()
+    index = header if header else load_index('master')
     return {
-        **master_index['stats'],
-        'generatedAt': master_index['generatedAt']
+        **index['stats'],
+        'generatedAt': index['generatedAt'],
+        'contentCache': _content_cache.stats(),
+        'queryCache': _query_cache.stats() if _query_cache else None
     }
 
 
+def _handle_batch_request(request: Dict[str, Any], postings_cache: Dict[str, Any]) -> Any:
+    """Run one JSONL batch request ({"op": ..., ...}; op defaults to 'search')"""
+    op = request.get('op', 'search')
+
+    if op == 'search':
+        query = request['query']
+        if request.get('mode', 'keyword') != 'keyword':
+            return search_resources(
+                query,
+                request.get('type'),
+                request.get('tags'),
+                request.get('limit', 10),
+                request.get('include_content', False),
+                request.get('max_tokens'),
+                request['mode']
+            )
+        return _search(
+            query,
+            request.get('type'),
+            request.get('tags'),
+            request.get('limit', 10),
+            request.get('include_content', False),
+            tokenize(query),
+            postings_cache,
+            request.get('max_tokens')
+        )
+    if op == 'get':
+        return get_resource_by_name(request['name'], request.get('type'), request.get('max_tokens'))
+    if op == 'instructions':
+        if 'paths' in request:
+            return instructions_for_many(request['paths'], request.get('root'))
+        return instructions_for(request['path'], request.get('root'))
+    if op == 'similar':
+        return find_similar_names(request['name'], request.get('type'), request.get('limit', SUGGESTION_LIMIT))
+    if op == 'outline':
+        return get_resource_outline(request['name'], request.get('type'))
+    if op == 'section':
+        return load_resource_section(request['name'], request['heading'], request.get('type'))
+    if op == 'list':
+        return list_resources(request.get('type'))
+    if op == 'stats':
+        return get_stats()
+    raise ValueError(f'Unknown op: {op}')
+
+
+def run_batch(input_stream=None, output_stream=None):
+    """
+    Read JSONL requests and stream one JSONL result per request, in order.
+    Each output line is {"id": ..., "result": ...} or {"id": ..., "error": ...};
+    id echoes the request's id (or its line number). The index stays loaded and
+    term postings are shared across the whole stream.
+    """
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+    postings_cache = _new_postings_cache()
+
+    for line_number, line in enumerate(input_stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        request_id: Any = line_number
+        try:
+            request = json.loads(line)
+            request_id = request.get('id', line_number)
+            response = {'id': request_id, 'result': _handle_batch_request(request, postings_cache)}
+        except KeyError as e:
+            response = {'id': request_id, 'error': f'Missing field: {e.args[0]}'}
+        except Exception as e:
+            response = {'id': request_id, 'error': str(e)}
+
+        output_stream.write(json.dumps(response) + '\n')
+        output_stream.flush()
+
+
+def _print_json(data: Any):
+    """Write a CLI result to stdout (timed as 'serialization' under --profile)"""
+    with phase('serialization'):
+        text = json.dumps(data, indent=2)
+    print(text)
+
+
 def main():
     """CLI interface"""
+    # CPU time spent so far: interpreter startup plus imports
+    startup_seconds = time.process_time()
+
+    # --profile[=<cprofile dump>] may appear anywhere; the JSON report goes to stderr
+    profile_args = [arg for arg in sys.argv[1:] if arg == '--profile' or arg.startswith('--profile=')]
+    if profile_args:
+        sys.argv = [arg for arg in sys.argv if arg not in profile_args]
+        dump = profile_args[-1].partition('=')[2]
+        profiling.start(Path(dump) if dump else None)
+        profiling.record('startup', startup_seconds)
+
+    try:
+        _run_command()
+    finally:
+        if profile_args:
+            print(json.dumps(profiling.stop(), indent=2), file=sys.stderr)
+
+
+def _run_command():
+    """Dispatch the CLI command in sys.argv"""
     if len(sys.argv) < 2:
         print('Usage:')
-        print('  resource_loader.py search <query> [--type=<type>] [--content]')
-        print('  resource_loader.py get <name> [--type=<type>]')
+        print('  resource_loader.py search <query> [--type=<type>] [--content] [--max-tokens=<n>] [--mode=vector]')
+        print('  resource_loader.py get <name> [--type=<type>] [--max-tokens=<n>]')
+        print('  resource_loader.py instructions [--root=<dir>] <path> [<path> ...]   (or paths on stdin)')
+        print('  resource_loader.py similar <name> [--type=<type>] [--limit=<n>]')
+        print('  resource_loader.py outline <name> [--type=<type>]')
+        print('  resource_loader.py section <name> <heading> [--type=<type>]')
         print('  resource_loader.py list [type]')
         print('  resource_loader.py stats')
+        print('  resource_loader.py batch < requests.jsonl')
+        print('')
+        print('Add --profile[=<file.prof>] to any command for a JSON timing breakdown on stderr')
         print('')
         print('Types: claude-skill, copilot-agent, copilot-prompt, copilot-instruction')
         sys.exit(1)
@@ -165,45 +1073,123 @@ def main():
     try:
         if command == 'search':
             if len(sys.argv) < 3:
-                print('Usage: resource_loader.py search <query> [--type=<type>] [--content]')
+                print('Usage: resource_loader.py search <query> [--type=<type>] [--content] [--max-tokens=<n>] '
+                      '[--mode=vector]')
                 sys.exit(1)
 
             query = sys.argv[2]
             resource_type = None
             include_content = False
+            max_tokens = None
+            mode = 'keyword'
 
             for arg in sys.argv[3:]:
                 if arg.startswith('--type='):
                     resource_type = arg.split('=', 1)[1]
                 elif arg == '--content':
                     include_content = True
+                elif arg.startswith('--max-tokens='):
+                    max_tokens = int(arg.split('=', 1)[1])
+                elif arg.startswith('--mode='):
+                    mode = arg.split('=', 1)[1]
 
-            results = search_resources(query, resource_type=resource_type, include_content=include_content)
-            print(json.dumps(results, indent=2))
+            results = search_resources(query, resource_type=resource_type, include_content=include_content,
+                                       max_tokens=max_tokens, mode=mode)
+            _print_json(results)
 
         elif command == 'get':
             if len(sys.argv) < 3:
-                print('Usage: resource_loader.py get <name> [--type=<type>]')
+                print('Usage: resource_loader.py get <name> [--type=<type>] [--max-tokens=<n>]')
                 sys.exit(1)
 
             name = sys.argv[2]
             resource_type = None
+            max_tokens = None
 
             for arg in sys.argv[3:]:
                 if arg.startswith('--type='):
                     resource_type = arg.split('=', 1)[1]
+                elif arg.startswith('--max-tokens='):
+                    max_tokens = int(arg.split('=', 1)[1])
+
+            resource = get_resource_by_name(name, resource_type, max_tokens)
+            _print_json(resource)
 
-            resource = get_resource_by_name(name, resource_type)
-            print(json.dumps(resource, indent=2))
+        elif command == 'instructions':
+            root = None
+            paths = []
+            for arg in sys.argv[2:]:
+                if arg.startswith('--root='):
+                    root = arg.split('=', 1)[1]
+                else:
+                    paths.append(arg)
+            paths = paths or [line.strip() for line in sys.stdin if line.strip()]
+            matches = instructions_for_many(paths, root)
+            _print_json({
+                path: [{'name': r['name'], 'path': r['path'], 'appliesTo': r.get('appliesTo', '')} for r in found]
+                for path, found in matches.items()
+            })
+
+        elif command == 'similar':
+            if len(sys.argv) < 3:
+                print('Usage: resource_loader.py similar <name> [--type=<type>] [--limit=<n>]')
+                sys.exit(1)
+
+            name = sys.argv[2]
+            resource_type = None
+            limit = SUGGESTION_LIMIT
+
+            for arg in sys.argv[3:]:
+                if arg.startswith('--type='):
+                    resource_type = arg.split('=', 1)[1]
+                elif arg.startswith('--limit='):
+                    limit = int(arg.split('=', 1)[1])
+
+            matches = find_similar_names(name, resource_type, limit)
+            _print_json(matches)
+
+        elif command == 'outline':
+            if len(sys.argv) < 3:
+                print('Usage: resource_loader.py outline <name> [--type=<type>]')
+                sys.exit(1)
+
+            name = sys.argv[2]
+            resource_type = None
+
+            for arg in sys.argv[3:]:
+                if arg.startswith('--type='):
+                    resource_type = arg.split('=', 1)[1]
+
+            outline = get_resource_outline(name, resource_type)
+            _print_json(outline)
+
+        elif command == 'section':
+            if len(sys.argv) < 4:
+                print('Usage: resource_loader.py section <name> <heading> [--type=<type>]')
+                sys.exit(1)
+
+            name = sys.argv[2]
+            heading = sys.argv[3]
+            resource_type = None
+
+            for arg in sys.argv[4:]:
+                if arg.startswith('--type='):
+                    resource_type = arg.split('=', 1)[1]
+
+            section = load_resource_section(name, heading, resource_type)
+            _print_json(section)
 
         elif command == 'list':
             resource_type = sys.argv[2] if len(sys.argv) > 2 else None
             resources = list_resources(resource_type)
-            print(json.dumps(resources, indent=2))
+            _print_json(resources)
 
         elif command == 'stats':
             stats = get_stats()
-            print(json.dumps(stats, indent=2))
+            _print_json(stats)
+
+        elif command == 'batch':
+            run_batch()
 
         else:
             print(f'Unknown command: {command}')
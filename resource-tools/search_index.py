@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+
+"""
+Search Index
+Inverted index and BM25 ranking shared by index_builder and resource_loader
+The builder persists the index as indexes/search-index.json; the loader ranks
+queries against it by intersecting postings instead of scanning every resource
+"""
+
+import bisect
+import heapq
+import math
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+# Bump when the on-disk layout changes so stale indexes are ignored
+SEARCH_INDEX_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in',
+    'into', 'is', 'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with'
+}
+
+# Term frequency in each field is multiplied by its weight (BM25F-style)
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'tags': 2.0,
+    'description': 1.0,
+}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Weighted tf of vocabulary terms that merely start with a query term
+# ('react' -> 'reactjs') is scaled by this, so exact matches rank first
+PREFIX_WEIGHT = 0.5
+
+# File-name suffixes stripped before fuzzy name matching
+NAME_SUFFIX_PATTERN = re.compile(r'(\.(agent|prompt|instructions?|chatmode))?(\.md)?$')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords"""
+    if not text:
+        return []
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _field_text(resource: Dict[str, Any], field: str) -> str:
+    """Text of a resource field (lists are joined)"""
+    value = resource.get(field) or ''
+    if isinstance(value, list):
+        return ' '.join(str(v) for v in value)
+    return str(value)
+
+
+def build_search_index(resources: List[Dict[str, Any]], generated_at: str) -> Dict[str, Any]:
+    """
+    Build an inverted index over name, tags and description.
+    Postings map token -> [[doc_id, weighted_tf], ...] sorted by doc_id;
+    doc_id is the position of the resource path in 'docs'.
+    """
+    postings: Dict[str, List[List[float]]] = {}
+    doc_lengths = []
+
+    for doc_id, resource in enumerate(resources):
+        weighted_tf: Dict[str, float] = {}
+        length = 0.0
+
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(_field_text(resource, field)):
+                weighted_tf[token] = weighted_tf.get(token, 0.0) + weight
+                length += weight
+
+        doc_lengths.append(length)
+        for token, tf in weighted_tf.items():
+            postings.setdefault(token, []).append([doc_id, tf])
+
+    doc_count = len(resources)
+    return {
+        'version': SEARCH_INDEX_VERSION,
+        'generatedAt': generated_at,
+        'docCount': doc_count,
+        'avgDocLength': (sum(doc_lengths) / doc_count) if doc_count else 0.0,
+        'docs': [r['path'] for r in resources],
+        'docLengths': doc_lengths,
+        'postings': {token: postings[token] for token in sorted(postings)},
+    }
+
+
+def _vocabulary(search_index: Dict[str, Any]) -> List[str]:
+    """Sorted token list (postings are written in sorted order)"""
+    vocabulary = search_index.get('_vocabulary')
+    if vocabulary is None:
+        vocabulary = list(search_index['postings'])
+        search_index['_vocabulary'] = vocabulary
+    return vocabulary
+
+
+def _term_postings(
+    search_index: Dict[str, Any],
+    term: str,
+    cache: Optional[Dict[str, Dict[int, float]]] = None
+) -> Dict[int, float]:
+    """
+    doc_id -> weighted tf for a query term.
+    Every query term is also a prefix: postings of longer vocabulary terms
+    (e.g. 'react' -> 'reactjs', 'reactive'), found with a binary search, are
+    merged in at PREFIX_WEIGHT.
+    Results are memoized in cache when one is given (e.g. across a batch).
+    """
+    if cache is not None and term in cache:
+        return cache[term]
+
+    merged = _resolve_postings(search_index, term)
+    if cache is not None:
+        cache[term] = merged
+    return merged
+
+
+def _resolve_postings(search_index: Dict[str, Any], term: str) -> Dict[int, float]:
+    postings = search_index['postings']
+    merged: Dict[int, float] = dict(postings.get(term, ()))
+
+    vocabulary = _vocabulary(search_index)
+    i = bisect.bisect_right(vocabulary, term)
+    while i < len(vocabulary) and vocabulary[i].startswith(term):
+        for doc_id, tf in postings[vocabulary[i]]:
+            tf *= PREFIX_WEIGHT
+            if tf > merged.get(doc_id, 0.0):
+                merged[doc_id] = tf
+        i += 1
+    return merged
+
+
+def rank(
+    search_index: Dict[str, Any],
+    query: str,
+    terms: Optional[List[str]] = None,
+    postings_cache: Optional[Dict[str, Dict[int, float]]] = None,
+    limit: Optional[int] = None,
+    boost: Optional[Dict[str, float]] = None
+) -> List[Tuple[str, float]]:
+    """
+    Rank documents for a query with BM25.
+    Documents must match every query term (postings are intersected, rarest
+    term first); if no document matches all terms, any-term matches are used.
+    Pass pre-tokenized terms and a shared postings_cache to batch queries.
+    boost adds a bonus to the score of the given paths before selection.
+    Returns [(path, score), ...] best first (ties by path), only the best
+    `limit` when given: those are picked with a heap instead of sorting
+    every match.
+    """
+    terms = list(dict.fromkeys(tokenize(query) if terms is None else terms))
+    if not terms:
+        return []
+
+    term_postings = [(term, _term_postings(search_index, term, postings_cache)) for term in terms]
+    term_postings = [(term, p) for term, p in term_postings if p]
+    if not term_postings:
+        return []
+
+    # Intersect, starting from the shortest postings list
+    term_postings.sort(key=lambda item: len(item[1]))
+    candidates = set(term_postings[0][1])
+    for _, p in term_postings[1:]:
+        candidates.intersection_update(p)
+        if not candidates:
+            break
+
+    if not candidates or len(term_postings) < len(terms):
+        candidates = set()
+        for _, p in term_postings:
+            candidates.update(p)
+
+    doc_count = search_index['docCount']
+    avg_length = search_index['avgDocLength'] or 1.0
+    doc_lengths = search_index['docLengths']
+    docs = search_index['docs']
+
+    scores: Dict[int, float] = {}
+    for _, p in term_postings:
+        df = len(p)
+        idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+        for doc_id in candidates:
+            tf = p.get(doc_id)
+            if not tf:
+                continue
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[doc_id] / avg_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    if boost:
+        for doc_id in scores:
+            bonus = boost.get(docs[doc_id])
+            if bonus:
+                scores[doc_id] += bonus
+
+    def order(item):
+        return -item[1], docs[item[0]]
+
+    best = heapq.nsmallest(limit, scores.items(), key=order) if limit is not None \
+        else sorted(scores.items(), key=order)
+    return [(docs[doc_id], score) for doc_id, score in best]
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase name without .agent/.prompt/.instructions/.md suffixes or punctuation"""
+    name = NAME_SUFFIX_PATTERN.sub('', name.strip().lower(), count=1)
+    return ' '.join(TOKEN_PATTERN.findall(name))
+
+
+def trigrams(key: str) -> set:
+    """Character trigrams of a normalized name, padded so short names still match"""
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _file_name(path: str) -> str:
+    """File name of a resource path (the folder name for SKILL.md)"""
+    file_name = path.rsplit('/', 1)[-1]
+    if file_name.upper() == 'SKILL.MD' and '/' in path:
+        file_name = path.rsplit('/', 2)[-2]
+    return file_name
+
+
+def _name_aliases(resource: Dict[str, Any]) -> List[str]:
+    """
+    Normalized keys for a resource: its name and file (or skill folder) name,
+    plus those of duplicates collapsed into it
+    """
+    keys = []
+    for named in [resource, *resource.get('aliases', [])]:
+        keys += [normalize_name(named['name']), normalize_name(_file_name(named['path']))]
+    return [k for k in dict.fromkeys(keys) if k]
+
+
+def build_name_index(resources: List[Dict[str, Any]], generated_at: str) -> Dict[str, Any]:
+    """
+    Trigram index over normalized resource names and file names.
+    'keys' are the distinct normalized names, 'paths' the resources per key,
+    'sizes' the trigram count per key, and 'trigrams' maps trigram -> [key_id, ...].
+    """
+    key_ids: Dict[str, int] = {}
+    paths: List[List[str]] = []
+    sizes: List[int] = []
+    grams: Dict[str, List[int]] = {}
+
+    for resource in resources:
+        for key in _name_aliases(resource):
+            if key not in key_ids:
+                key_ids[key] = len(paths)
+                paths.append([])
+                key_grams = trigrams(key)
+                sizes.append(len(key_grams))
+                for gram in key_grams:
+                    grams.setdefault(gram, []).append(key_ids[key])
+            if resource['path'] not in paths[key_ids[key]]:
+                paths[key_ids[key]].append(resource['path'])
+
+    return {
+        'version': SEARCH_INDEX_VERSION,
+        'generatedAt': generated_at,
+        'keys': list(key_ids),
+        'paths': paths,
+        'sizes': sizes,
+        'trigrams': {gram: grams[gram] for gram in sorted(grams)},
+    }
+
+
+def similar_names(name_index: Dict[str, Any], name: str, limit: int = 5) -> List[Tuple[str, float]]:
+    """
+    Keys most similar to name by trigram Jaccard similarity, best first.
+    Only keys sharing at least one trigram are scored, so the cost depends on
+    the query's trigram postings rather than on the number of resources.
+    Returns [(key_id, similarity), ...]; key_id indexes 'keys' and 'paths'.
+    """
+    key = normalize_name(name)
+    if not key:
+        return []
+
+    query_grams = trigrams(key)
+    shared: Dict[int, int] = {}
+    for gram in query_grams:
+        for key_id in name_index['trigrams'].get(gram, ()):
+            shared[key_id] = shared.get(key_id, 0) + 1
+
+    keys = name_index['keys']
+    sizes = name_index['sizes']
+    scored = [
+        (key_id, count / (len(query_grams) + sizes[key_id] - count))
+        for key_id, count in shared.items()
+    ]
+
+    best = heapq.nsmallest(limit, scored, key=lambda item: (-item[1], keys[item[0]]))
+    return [(key_id, round(similarity, 4)) for key_id, similarity in best]
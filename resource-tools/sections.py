@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+"""
+Sections
+Markdown heading outline with byte offsets, shared by index_builder and
+resource_loader. A section spans from its heading line to the next heading of
+the same or higher level, so it includes its subsections
+"""
+
+import re
+from typing import Dict, Iterable, List, Any, Optional
+
+HEADING_PATTERN = re.compile(rb'^(#{1,6})[ \t]+(.+?)[ \t#]*$')
+FENCE_PATTERN = re.compile(rb'^[ \t]{0,3}(```|~~~)')
+
+# Rough UTF-8 bytes per model token for English markdown
+BYTES_PER_TOKEN = 4
+
+
+def estimate_tokens(byte_count: int) -> int:
+    """Estimated model tokens for byte_count bytes of text"""
+    return (byte_count + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+
+
+def extract_outline(raw: bytes) -> List[Dict[str, Any]]:
+    """
+    Headings of a markdown document as [{heading, level, offset, length, tokens}, ...].
+    offset/length are in bytes of the UTF-8 file, tokens is estimate_tokens(length);
+    headings inside fenced code blocks are ignored.
+    """
+    return extract_outline_lines(raw.splitlines(keepends=True))
+
+
+def extract_outline_lines(lines: Iterable[bytes]) -> List[Dict[str, Any]]:
+    """extract_outline over an iterable of lines (e.g. an open binary file), in constant memory"""
+    headings = []
+    offset = 0
+    in_fence = False
+
+    for line in lines:
+        stripped = line.rstrip(b'\r\n')
+        if FENCE_PATTERN.match(stripped):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = HEADING_PATTERN.match(stripped)
+            if match:
+                headings.append({
+                    'heading': match.group(2).decode('utf-8', errors='replace').strip(),
+                    'level': len(match.group(1)),
+                    'offset': offset
+                })
+        offset += len(line)
+
+    # Each section ends where the next heading of the same or higher level starts
+    for i, section in enumerate(headings):
+        end = offset
+        for following in headings[i + 1:]:
+            if following['level'] <= section['level']:
+                end = following['offset']
+                break
+        section['length'] = end - section['offset']
+        section['tokens'] = estimate_tokens(section['length'])
+
+    return headings
+
+
+def find_section(outline: List[Dict[str, Any]], heading: str) -> Optional[Dict[str, Any]]:
+    """
+    Find a section by heading text: case-insensitive exact match first,
+    then the first heading containing the text. Leading '#' marks are ignored.
+    """
+    wanted = heading.strip().lstrip('#').strip().lower()
+    if not wanted:
+        return None
+
+    exact = next((s for s in outline if s['heading'].lower() == wanted), None)
+    if exact:
+        return exact
+    return next((s for s in outline if wanted in s['heading'].lower()), None)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+"""
+SQLite Backend
+Optional storage for the resource index: one row per resource, indexed type
+and tag columns, and an FTS5 table over name, description and body text.
+index_builder writes indexes/resources.db; resource_loader queries it when
+RESOURCE_TOOLS_BACKEND=sqlite, so lookups never load the JSON index into memory
+"""
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from atomic_file import mkstemp_for
+from search_index import tokenize
+
+SCHEMA_VERSION = 1
+
+SCHEMA = '''
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE resources (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    type TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE INDEX idx_resources_type ON resources(type);
+CREATE INDEX idx_resources_name ON resources(name);
+CREATE INDEX idx_resources_name_lower ON resources(name_lower);
+CREATE TABLE resource_tags (
+    resource_id INTEGER NOT NULL REFERENCES resources(id),
+    tag TEXT NOT NULL
+);
+CREATE INDEX idx_resource_tags_tag ON resource_tags(tag, resource_id);
+CREATE VIRTUAL TABLE resources_fts USING fts5(name, description, body);
+'''
+
+# bm25() column weights for name, description, body
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def write_database(
+    db_path: Path,
+    resources: List[Dict[str, Any]],
+    read_body,
+    generated_at: str,
+    stats: Dict[str, Any]
+):
+    """
+    Write a fresh database to db_path.
+    read_body(resource) returns the file text for the FTS body column.
+    The database is built in a uniquely named temporary file (concurrent
+    builders never share one) and renamed into place.
+    """
+    fd, tmp_name = mkstemp_for(db_path)
+    os.close(fd)
+
+    conn = sqlite3.connect(tmp_name)
+    try:
+        conn.executescript(SCHEMA)
+        conn.executemany('INSERT INTO meta (key, value) VALUES (?, ?)', [
+            ('schemaVersion', str(SCHEMA_VERSION)),
+            ('generatedAt', generated_at),
+            ('stats', json.dumps(stats)),
+        ])
+
+        for resource in resources:
+            cursor = conn.execute(
+                'INSERT INTO resources (name, name_lower, type, path, data) VALUES (?, ?, ?, ?, ?)',
+                (resource['name'], resource['name'].lower(), resource['type'],
+                 resource['path'], json.dumps(resource))
+            )
+            resource_id = cursor.lastrowid
+            conn.executemany(
+                'INSERT INTO resource_tags (resource_id, tag) VALUES (?, ?)',
+                [(resource_id, tag) for tag in resource.get('tags', []) if tag]
+            )
+            conn.execute(
+                'INSERT INTO resources_fts (rowid, name, description, body) VALUES (?, ?, ?, ?)',
+                (resource_id, resource['name'], resource.get('description', ''), read_body(resource))
+            )
+
+        conn.commit()
+        conn.close()
+        os.replace(tmp_name, db_path)
+    except BaseException:
+        conn.close()
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open the database read-only"""
+    conn = sqlite3.connect(f'file:{db_path.as_posix()}?mode=ro', uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    """Read one value from the meta table"""
+    row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    return row['value'] if row else None
+
+
+def _fts_query(query: str, operator: str) -> str:
+    """Quote each query token as an FTS5 prefix term joined by operator"""
+    return f' {operator} '.join(f'"{token}"*' for token in dict.fromkeys(tokenize(query)))
+
+
+def _filters(resource_type: Optional[str], tags: Optional[List[str]]):
+    """SQL WHERE fragments and parameters for type/tag filtering"""
+    clauses = []
+    params: List[Any] = []
+    if resource_type:
+        clauses.append('r.type = ?')
+        params.append(resource_type)
+    if tags:
+        clauses.append(
+            f'r.id IN (SELECT resource_id FROM resource_tags WHERE tag IN ({", ".join("?" * len(tags))}))'
+        )
+        params.extend(tags)
+    return clauses, params
+
+
+def search(
+    conn: sqlite3.Connection,
+    query: str,
+    resource_type: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Full-text search ranked by FTS5 bm25 (lower is better in SQLite; scores are
+    negated so higher is better, as in search_index.rank). All query terms must
+    match; if nothing does, any-term matches are returned.
+    """
+    clauses, params = _filters(resource_type, tags)
+    where = ''.join(f' AND {c}' for c in clauses)
+    query_lower = query.lower()
+
+    for operator in ('AND', 'OR'):
+        match = _fts_query(query, operator)
+        if not match:
+            break
+
+        rows = conn.execute(
+            f'''SELECT r.data AS data, -bm25(resources_fts, ?, ?, ?) AS score
+                FROM resources_fts JOIN resources r ON r.id = resources_fts.rowid
+                WHERE resources_fts MATCH ?{where}
+                ORDER BY (r.name_lower = ?) DESC, score DESC, r.name
+                LIMIT ?''',
+            (*FTS_WEIGHTS, match, *params, query_lower, limit)
+        ).fetchall()
+        if rows:
+            return [{**json.loads(row['data']), 'score': round(row['score'], 4)} for row in rows]
+
+    # No indexable tokens (e.g. punctuation-only query): substring match on name/description
+    pattern = f'%{query_lower}%'
+    rows = conn.execute(
+        f'''SELECT r.data AS data FROM resources r
+            WHERE (r.name_lower LIKE ? OR lower(json_extract(r.data, '$.description')) LIKE ?){where}
+            ORDER BY (r.name_lower = ?) DESC, r.name
+            LIMIT ?''',
+        (pattern, pattern, *params, query_lower, limit)
+    ).fetchall()
+    return [json.loads(row['data']) for row in rows]
+
+
+def get_by_name(
+    conn: sqlite3.Connection,
+    name: str,
+    resource_type: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Exact name match, then case-insensitive match"""
+    clauses, params = _filters(resource_type, None)
+    where = ''.join(f' AND {c}' for c in clauses)
+
+    for column, value in (('name', name), ('name_lower', name.lower())):
+        row = conn.execute(
+            f'SELECT r.data AS data FROM resources r WHERE r.{column} = ?{where} ORDER BY r.id LIMIT 1',
+            (value, *params)
+        ).fetchone()
+        if row:
+            return json.loads(row['data'])
+    return None
+
+
+def get_by_path(conn: sqlite3.Connection, path: str) -> Optional[Dict[str, Any]]:
+    """Resource with this workspace-relative path"""
+    row = conn.execute('SELECT data FROM resources WHERE path = ?', (path,)).fetchone()
+    return json.loads(row['data']) if row else None
+
+
+def list_by_type(conn: sqlite3.Connection, resource_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """All resources (optionally of one type) in index order"""
+    clauses, params = _filters(resource_type, None)
+    where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+    rows = conn.execute(f'SELECT r.data AS data FROM resources r{where} ORDER BY r.id', params).fetchall()
+    return [json.loads(row['data']) for row in rows]
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+"""
+Vector Index
+TF-IDF vectors over name, description and body text for offline similarity
+search. index_builder writes indexes/vectors.npz (index_builder.py --vectors);
+resource_loader scores queries against it with cosine similarity and
+np.argpartition top-k. Requires NumPy; everything else works without it
+"""
+
+import math
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from atomic_file import mkstemp_for
+from search_index import tokenize
+
+# NumPy, imported by require_numpy() on first use: it is optional, and
+# importing it up front would add ~100 ms to every resource_loader start
+np = None
+
+# Bump when the on-disk layout changes so stale indexes are ignored
+VECTOR_INDEX_VERSION = 1
+
+# Term counts in each field are multiplied by its weight before TF-IDF
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'description': 2.0,
+    'body': 1.0,
+}
+
+
+def require_numpy():
+    """Import NumPy, raising a readable error when it is not installed"""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError('Vector search requires NumPy (pip install numpy)')
+        np = numpy
+
+
+def _weighted_counts(resource: Dict[str, Any], body: str) -> Dict[str, float]:
+    counts: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        text = body if field == 'body' else (resource.get(field) or '')
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0.0) + weight
+    return counts
+
+
+def write_vector_index(
+    index_path: Path,
+    resources: List[Dict[str, Any]],
+    read_body: Callable[[Dict[str, Any]], str],
+    generated_at: str
+) -> int:
+    """
+    Build L2-normalized TF-IDF vectors (sublinear tf) and save them term-major,
+    like postings: term t's entries are doc_ids[term_ptr[t]:term_ptr[t + 1]]
+    with weights[...]. Written to a temporary file and renamed into place.
+    Returns the vocabulary size.
+    """
+    require_numpy()
+
+    doc_counts = [_weighted_counts(r, read_body(r)) for r in resources]
+    df: Dict[str, int] = {}
+    for counts in doc_counts:
+        for token in counts:
+            df[token] = df.get(token, 0) + 1
+
+    vocabulary = sorted(df)
+    term_ids = {token: i for i, token in enumerate(vocabulary)}
+    doc_count = len(resources)
+    idf = [math.log((1 + doc_count) / (1 + df[token])) + 1 for token in vocabulary]
+
+    postings: List[List[Tuple[int, float]]] = [[] for _ in vocabulary]
+    for doc_id, counts in enumerate(doc_counts):
+        weights = {term_ids[t]: (1 + math.log(c)) * idf[term_ids[t]] for t, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        for term_id, weight in weights.items():
+            postings[term_id].append((doc_id, weight / norm))
+
+    term_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    term_ptr[1:] = np.cumsum([len(p) for p in postings])
+    doc_ids = np.fromiter((d for p in postings for d, _ in p), dtype=np.int32, count=int(term_ptr[-1]))
+    weights = np.fromiter((w for p in postings for _, w in p), dtype=np.float32, count=int(term_ptr[-1]))
+
+    fd, tmp_name = mkstemp_for(index_path)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez_compressed(
+                f,
+                version=np.array(VECTOR_INDEX_VERSION),
+                generated_at=np.array(generated_at),
+                docs=np.array([r['path'] for r in resources]),
+                vocabulary=np.array(vocabulary),
+                idf=np.array(idf, dtype=np.float32),
+                term_ptr=term_ptr,
+                doc_ids=doc_ids,
+                weights=weights,
+            )
+        os.replace(tmp_name, index_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    return len(vocabulary)
+
+
+def load_vector_index(index_path: Path) -> Optional[Dict[str, Any]]:
+    """Arrays of vectors.npz plus a term lookup, or None if missing or of another version"""
+    require_numpy()
+    try:
+        with np.load(index_path) as data:
+            arrays = {key: data[key] for key in data.files}
+    except FileNotFoundError:
+        return None
+
+    if int(arrays['version']) != VECTOR_INDEX_VERSION:
+        return None
+    return {
+        'generatedAt': str(arrays['generated_at']),
+        'docs': arrays['docs'].tolist(),
+        'termIds': {token: i for i, token in enumerate(arrays['vocabulary'].tolist())},
+        'idf': arrays['idf'],
+        'termPtr': arrays['term_ptr'],
+        'docIds': arrays['doc_ids'],
+        'weights': arrays['weights'],
+    }
+
+
+def top_k(vector_index: Dict[str, Any], query: str, k: int) -> List[Tuple[str, float]]:
+    """
+    Cosine similarity of the query's TF-IDF vector against every document,
+    accumulated over the query terms' postings; the k best are selected with
+    np.argpartition before sorting. Returns [(path, score), ...] best first.
+    """
+    counts: Dict[int, float] = {}
+    for token in tokenize(query):
+        term_id = vector_index['termIds'].get(token)
+        if term_id is not None:
+            counts[term_id] = counts.get(term_id, 0.0) + 1.0
+    if not counts or k <= 0:
+        return []
+
+    idf = vector_index['idf']
+    query_weights = {t: (1 + math.log(c)) * float(idf[t]) for t, c in counts.items()}
+    norm = math.sqrt(sum(w * w for w in query_weights.values()))
+
+    scores = np.zeros(len(vector_index['docs']), dtype=np.float32)
+    term_ptr = vector_index['termPtr']
+    for term_id, weight in query_weights.items():
+        start, end = term_ptr[term_id], term_ptr[term_id + 1]
+        scores[vector_index['docIds'][start:end]] += vector_index['weights'][start:end] * (weight / norm)
+
+    matched = np.flatnonzero(scores)
+    if len(matched) > k:
+        matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+    best = matched[np.argsort(-scores[matched], kind='stable')]
+
+    docs = vector_index['docs']
+    return [(docs[i], float(scores[i])) for i in best]